@@ -0,0 +1,42 @@
+"""Add normalized_name column to ingredients
+
+Revision ID: 1053b1ed5ff6
+Revises: 15098cd34f50
+Create Date: 2026-10-16 14:27:09.364115
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1053b1ed5ff6'
+down_revision: Union[str, None] = '15098cd34f50'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('ingredients', sa.Column('normalized_name', sa.String(length=100), nullable=True))
+
+    # Backfill with the SQL equivalent of normalize_ingredient_name: lowercase,
+    # drop everything but [a-z0-9], whitespace and hyphens, collapse spaces, trim.
+    # New and renamed rows are kept in sync by the ORM on flush.
+    op.execute(
+        r"""
+        UPDATE ingredients
+        SET normalized_name = btrim(regexp_replace(
+            regexp_replace(lower(name), '[^a-z0-9\s\-]', '', 'g'),
+            '\s+', ' ', 'g'
+        ))
+        """
+    )
+
+    op.create_index('ix_ingredients_normalized_name', 'ingredients', ['normalized_name'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_ingredients_normalized_name', table_name='ingredients')
+    op.drop_column('ingredients', 'normalized_name')
@@ -0,0 +1,91 @@
+"""Add composite indexes for popular, favorites and shopping list queries
+
+Revision ID: 15098cd34f50
+Revises: 2d5d30cb9955
+Create Date: 2026-10-16 14:02:38.551920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '15098cd34f50'
+down_revision: Union[str, None] = '2d5d30cb9955'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        # Popular recipes: ORDER BY view_count DESC LIMIT n becomes an index scan
+        op.create_index(
+            'ix_recipes_view_count',
+            'recipes',
+            [sa.text('view_count DESC')],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+
+        # Favorites list: WHERE user_id = ? ORDER BY created_at DESC
+        op.create_index(
+            'ix_user_favorites_user_created',
+            'user_favorites',
+            ['user_id', sa.text('created_at DESC')],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+
+        # Widen the active shopping list index to cover the duplicate check
+        # on (user_id, ingredient_id); build it before dropping the old one
+        op.create_index(
+            'ix_shopping_list_active_ingredient',
+            'shopping_list_items',
+            ['user_id', 'ingredient_id'],
+            unique=False,
+            postgresql_where=sa.text('is_purchased = false'),
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+        op.drop_index(
+            'ix_shopping_list_active',
+            table_name='shopping_list_items',
+            postgresql_concurrently=True,
+            if_exists=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_shopping_list_active',
+            'shopping_list_items',
+            ['user_id'],
+            unique=False,
+            postgresql_where=sa.text('is_purchased = false'),
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+        op.drop_index(
+            'ix_shopping_list_active_ingredient',
+            table_name='shopping_list_items',
+            postgresql_concurrently=True,
+            if_exists=True
+        )
+        op.drop_index(
+            'ix_user_favorites_user_created',
+            table_name='user_favorites',
+            postgresql_concurrently=True,
+            if_exists=True
+        )
+        op.drop_index(
+            'ix_recipes_view_count',
+            table_name='recipes',
+            postgresql_concurrently=True,
+            if_exists=True
+        )
@@ -0,0 +1,42 @@
+"""Add (cache_key, created_at) index on recipes
+
+Revision ID: 151e209683c9
+Revises: 60dd70385578
+Create Date: 2026-10-16 16:02:47.519360
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '151e209683c9'
+down_revision: Union[str, None] = '60dd70385578'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Serves cache lookups (cache_key = ? AND created_at >= ?) and lets the
+    # batched expiry scan test both of its conditions from the index
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_recipes_cache_key_created_at',
+            'recipes',
+            ['cache_key', 'created_at'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_recipes_cache_key_created_at',
+            table_name='recipes',
+            postgresql_concurrently=True,
+            if_exists=True
+        )
@@ -0,0 +1,51 @@
+"""Add missing foreign key indexes
+
+Revision ID: 1c54c4283136
+Revises: 1f4461550168
+Create Date: 2026-10-16 09:40:51.602917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1c54c4283136'
+down_revision: Union[str, None] = '1f4461550168'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Foreign key columns with ON DELETE CASCADE that had no supporting index
+FK_INDEXES = [
+    ('ix_shopping_list_items_ingredient_id', 'shopping_list_items', ['ingredient_id']),
+    ('ix_user_favorites_recipe_id', 'user_favorites', ['recipe_id']),
+    ('ix_recipe_ratings_user_id', 'recipe_ratings', ['user_id']),
+]
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        for index_name, table_name, columns in FK_INDEXES:
+            op.create_index(
+                index_name,
+                table_name,
+                columns,
+                unique=False,
+                postgresql_concurrently=True,
+                if_not_exists=True
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for index_name, table_name, _ in reversed(FK_INDEXES):
+            op.drop_index(
+                index_name,
+                table_name=table_name,
+                postgresql_concurrently=True,
+                if_exists=True
+            )
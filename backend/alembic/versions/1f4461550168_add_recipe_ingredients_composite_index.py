@@ -0,0 +1,43 @@
+"""Add composite index on recipe_ingredients (ingredient_id, recipe_id)
+
+Revision ID: 1f4461550168
+Revises: e9c6f0b96cc4
+Create Date: 2026-10-16 09:12:04.118342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1f4461550168'
+down_revision: Union[str, None] = 'e9c6f0b96cc4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Remove duplicate (recipe, ingredient) pairs so the unique index can be built
+    op.execute(
+        """
+        DELETE FROM recipe_ingredients a
+        USING recipe_ingredients b
+        WHERE a.recipe_id = b.recipe_id
+          AND a.ingredient_id = b.ingredient_id
+          AND a.id > b.id
+        """
+    )
+
+    # Ingredient-first order serves "which recipes use ingredient X?" as an index-only scan
+    op.create_index(
+        'ix_recipe_ingredients_ingredient_recipe',
+        'recipe_ingredients',
+        ['ingredient_id', 'recipe_id'],
+        unique=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_recipe_ingredients_ingredient_recipe', table_name='recipe_ingredients')
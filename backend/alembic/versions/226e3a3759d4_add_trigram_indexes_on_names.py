@@ -0,0 +1,46 @@
+"""Add trigram indexes on recipes.name and ingredients.name
+
+Revision ID: 226e3a3759d4
+Revises: e7b6f5c6f438
+Create Date: 2026-10-16 10:31:12.940276
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '226e3a3759d4'
+down_revision: Union[str, None] = 'e7b6f5c6f438'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # Trigram indexes serve leading-wildcard LIKE/ILIKE and similarity (%) searches;
+    # the existing B-tree indexes are kept for equality lookups
+    op.create_index(
+        'ix_recipes_name_trgm',
+        'recipes',
+        ['name'],
+        unique=False,
+        postgresql_using='gin',
+        postgresql_ops={'name': 'gin_trgm_ops'}
+    )
+    op.create_index(
+        'ix_ingredients_name_trgm',
+        'ingredients',
+        ['name'],
+        unique=False,
+        postgresql_using='gin',
+        postgresql_ops={'name': 'gin_trgm_ops'}
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_ingredients_name_trgm', table_name='ingredients')
+    op.drop_index('ix_recipes_name_trgm', table_name='recipes')
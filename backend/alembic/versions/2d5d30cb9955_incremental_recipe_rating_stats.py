@@ -0,0 +1,71 @@
+"""Maintain recipe rating stats incrementally
+
+Revision ID: 2d5d30cb9955
+Revises: 9fb0eb7229ed
+Create Date: 2026-10-16 13:21:47.903115
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2d5d30cb9955'
+down_revision: Union[str, None] = '9fb0eb7229ed'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Apply each change as a delta on the recipes row instead of re-aggregating
+    # recipe_ratings; refresh_recipe_rating_stats() stays available for repairs
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION recipe_ratings_stats_trigger() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'UPDATE' AND OLD.recipe_id = NEW.recipe_id THEN
+                UPDATE recipes
+                SET avg_rating = avg_rating + (NEW.rating - OLD.rating)::float / rating_count
+                WHERE id = NEW.recipe_id AND rating_count > 0;
+                RETURN NULL;
+            END IF;
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                UPDATE recipes
+                SET rating_count = rating_count - 1,
+                    avg_rating = CASE
+                        WHEN rating_count <= 1 THEN NULL
+                        ELSE (avg_rating * rating_count - OLD.rating) / (rating_count - 1)
+                    END
+                WHERE id = OLD.recipe_id;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                UPDATE recipes
+                SET rating_count = rating_count + 1,
+                    avg_rating = (COALESCE(avg_rating, 0) * rating_count + NEW.rating) / (rating_count + 1)
+                WHERE id = NEW.recipe_id;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION recipe_ratings_stats_trigger() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                PERFORM refresh_recipe_rating_stats(NEW.recipe_id);
+            END IF;
+            IF TG_OP = 'DELETE' OR (TG_OP = 'UPDATE' AND OLD.recipe_id <> NEW.recipe_id) THEN
+                PERFORM refresh_recipe_rating_stats(OLD.recipe_id);
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
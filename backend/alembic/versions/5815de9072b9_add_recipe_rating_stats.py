@@ -0,0 +1,91 @@
+"""Add denormalized rating stats to recipes
+
+Revision ID: 5815de9072b9
+Revises: e51d0dd72df2
+Create Date: 2026-10-16 11:52:09.337418
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5815de9072b9'
+down_revision: Union[str, None] = 'e51d0dd72df2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('recipes', sa.Column('avg_rating', sa.Float(), nullable=True))
+    op.add_column(
+        'recipes',
+        sa.Column('rating_count', sa.Integer(), server_default='0', nullable=False)
+    )
+    op.create_index('ix_recipes_avg_rating', 'recipes', ['avg_rating'], unique=False)
+
+    # Backfill from existing ratings
+    op.execute(
+        """
+        UPDATE recipes r
+        SET avg_rating = s.avg_rating,
+            rating_count = s.rating_count
+        FROM (
+            SELECT recipe_id, AVG(rating)::float AS avg_rating, COUNT(*) AS rating_count
+            FROM recipe_ratings
+            GROUP BY recipe_id
+        ) s
+        WHERE r.id = s.recipe_id
+        """
+    )
+
+    # Keep the stats in sync with recipe_ratings. Recomputing from the
+    # recipe_id index keeps the values exact and is cheap per recipe.
+    op.execute(
+        """
+        CREATE FUNCTION refresh_recipe_rating_stats(p_recipe_id integer) RETURNS void AS $$
+        BEGIN
+            UPDATE recipes
+            SET (avg_rating, rating_count) = (
+                SELECT AVG(rating)::float, COUNT(*)
+                FROM recipe_ratings
+                WHERE recipe_id = p_recipe_id
+            )
+            WHERE id = p_recipe_id;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE FUNCTION recipe_ratings_stats_trigger() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                PERFORM refresh_recipe_rating_stats(NEW.recipe_id);
+            END IF;
+            IF TG_OP = 'DELETE' OR (TG_OP = 'UPDATE' AND OLD.recipe_id <> NEW.recipe_id) THEN
+                PERFORM refresh_recipe_rating_stats(OLD.recipe_id);
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER recipe_ratings_stats
+        AFTER INSERT OR UPDATE OF rating, recipe_id OR DELETE ON recipe_ratings
+        FOR EACH ROW EXECUTE FUNCTION recipe_ratings_stats_trigger()
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS recipe_ratings_stats ON recipe_ratings")
+    op.execute("DROP FUNCTION IF EXISTS recipe_ratings_stats_trigger()")
+    op.execute("DROP FUNCTION IF EXISTS refresh_recipe_rating_stats(integer)")
+    op.drop_index('ix_recipes_avg_rating', table_name='recipes')
+    op.drop_column('recipes', 'rating_count')
+    op.drop_column('recipes', 'avg_rating')
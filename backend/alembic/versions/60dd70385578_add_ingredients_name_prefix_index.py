@@ -0,0 +1,42 @@
+"""Add lower(name) pattern index for ingredient prefix search
+
+Revision ID: 60dd70385578
+Revises: e89530b9348e
+Create Date: 2026-10-16 15:31:26.840219
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '60dd70385578'
+down_revision: Union[str, None] = 'e89530b9348e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # text_pattern_ops lets lower(name) LIKE 'q%' use a B-tree range scan
+    # regardless of the database collation
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_ingredients_name_lower_pattern',
+            'ingredients',
+            [sa.text('lower(name) text_pattern_ops')],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_ingredients_name_lower_pattern',
+            table_name='ingredients',
+            postgresql_concurrently=True,
+            if_exists=True
+        )
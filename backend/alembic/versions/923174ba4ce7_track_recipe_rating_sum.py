@@ -0,0 +1,140 @@
+"""Track an integer rating sum for recipe rating stats
+
+Revision ID: 923174ba4ce7
+Revises: 151e209683c9
+Create Date: 2026-10-16 16:48:12.274915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '923174ba4ce7'
+down_revision: Union[str, None] = '151e209683c9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'recipes',
+        sa.Column('rating_sum', sa.Integer(), server_default='0', nullable=False)
+    )
+
+    # Recompute from the source rows; this also discards any rounding error
+    # the float-based incremental trigger accumulated in avg_rating
+    op.execute(
+        """
+        UPDATE recipes r
+        SET rating_sum = s.rating_sum,
+            rating_count = s.rating_count,
+            avg_rating = s.rating_sum::float / s.rating_count
+        FROM (
+            SELECT recipe_id, SUM(rating) AS rating_sum, COUNT(*) AS rating_count
+            FROM recipe_ratings
+            GROUP BY recipe_id
+        ) s
+        WHERE r.id = s.recipe_id
+        """
+    )
+
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION refresh_recipe_rating_stats(p_recipe_id integer) RETURNS void AS $$
+        BEGIN
+            UPDATE recipes
+            SET (rating_sum, rating_count, avg_rating) = (
+                SELECT COALESCE(SUM(rating), 0), COUNT(*), SUM(rating)::float / NULLIF(COUNT(*), 0)
+                FROM recipe_ratings
+                WHERE recipe_id = p_recipe_id
+            )
+            WHERE id = p_recipe_id;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+
+    # Apply each change as an exact integer delta on the sum and count, and
+    # derive the average from them so it can never drift
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION recipe_ratings_stats_trigger() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'UPDATE' AND OLD.recipe_id = NEW.recipe_id THEN
+                UPDATE recipes
+                SET rating_sum = rating_sum + NEW.rating - OLD.rating,
+                    avg_rating = (rating_sum + NEW.rating - OLD.rating)::float / NULLIF(rating_count, 0)
+                WHERE id = NEW.recipe_id;
+                RETURN NULL;
+            END IF;
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                UPDATE recipes
+                SET rating_sum = rating_sum - OLD.rating,
+                    rating_count = rating_count - 1,
+                    avg_rating = (rating_sum - OLD.rating)::float / NULLIF(rating_count - 1, 0)
+                WHERE id = OLD.recipe_id;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                UPDATE recipes
+                SET rating_sum = rating_sum + NEW.rating,
+                    rating_count = rating_count + 1,
+                    avg_rating = (rating_sum + NEW.rating)::float / (rating_count + 1)
+                WHERE id = NEW.recipe_id;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION recipe_ratings_stats_trigger() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'UPDATE' AND OLD.recipe_id = NEW.recipe_id THEN
+                UPDATE recipes
+                SET avg_rating = avg_rating + (NEW.rating - OLD.rating)::float / rating_count
+                WHERE id = NEW.recipe_id AND rating_count > 0;
+                RETURN NULL;
+            END IF;
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                UPDATE recipes
+                SET rating_count = rating_count - 1,
+                    avg_rating = CASE
+                        WHEN rating_count <= 1 THEN NULL
+                        ELSE (avg_rating * rating_count - OLD.rating) / (rating_count - 1)
+                    END
+                WHERE id = OLD.recipe_id;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                UPDATE recipes
+                SET rating_count = rating_count + 1,
+                    avg_rating = (COALESCE(avg_rating, 0) * rating_count + NEW.rating) / (rating_count + 1)
+                WHERE id = NEW.recipe_id;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION refresh_recipe_rating_stats(p_recipe_id integer) RETURNS void AS $$
+        BEGIN
+            UPDATE recipes
+            SET (avg_rating, rating_count) = (
+                SELECT AVG(rating)::float, COUNT(*)
+                FROM recipe_ratings
+                WHERE recipe_id = p_recipe_id
+            )
+            WHERE id = p_recipe_id;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.drop_column('recipes', 'rating_sum')
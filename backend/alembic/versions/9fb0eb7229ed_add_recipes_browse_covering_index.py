@@ -0,0 +1,34 @@
+"""Add covering index for recipe browse queries
+
+Revision ID: 9fb0eb7229ed
+Revises: 5815de9072b9
+Create Date: 2026-10-16 12:08:44.172630
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9fb0eb7229ed'
+down_revision: Union[str, None] = '5815de9072b9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # INCLUDE columns (PostgreSQL 11+) let card listings filtered by difficulty
+    # and cooking time be answered with an index-only scan
+    op.create_index(
+        'ix_recipes_browse',
+        'recipes',
+        ['difficulty', 'cooking_time_minutes'],
+        unique=False,
+        postgresql_include=['name', 'image_url', 'view_count']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_recipes_browse', table_name='recipes')
@@ -0,0 +1,67 @@
+"""Convert recipes JSON columns to JSONB
+
+Revision ID: a7f46b9b84cb
+Revises: 226e3a3759d4
+Create Date: 2026-10-16 11:02:48.517063
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7f46b9b84cb'
+down_revision: Union[str, None] = '226e3a3759d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.alter_column(
+        'recipes',
+        'instructions',
+        type_=postgresql.JSONB(),
+        existing_type=sa.JSON(),
+        existing_nullable=False,
+        postgresql_using='instructions::jsonb'
+    )
+    op.alter_column(
+        'recipes',
+        'nutritional_info',
+        type_=postgresql.JSONB(),
+        existing_type=sa.JSON(),
+        existing_nullable=True,
+        postgresql_using='nutritional_info::jsonb'
+    )
+
+    # GIN index for containment filters such as nutritional_info @> '{"vegan": true}'
+    op.create_index(
+        'ix_recipes_nutritional_info',
+        'recipes',
+        ['nutritional_info'],
+        unique=False,
+        postgresql_using='gin'
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_recipes_nutritional_info', table_name='recipes')
+    op.alter_column(
+        'recipes',
+        'nutritional_info',
+        type_=sa.JSON(),
+        existing_type=postgresql.JSONB(),
+        existing_nullable=True,
+        postgresql_using='nutritional_info::json'
+    )
+    op.alter_column(
+        'recipes',
+        'instructions',
+        type_=sa.JSON(),
+        existing_type=postgresql.JSONB(),
+        existing_nullable=False,
+        postgresql_using='instructions::json'
+    )
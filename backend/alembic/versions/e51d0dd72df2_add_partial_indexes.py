@@ -0,0 +1,43 @@
+"""Add partial indexes for high ratings and active shopping lists
+
+Revision ID: e51d0dd72df2
+Revises: a7f46b9b84cb
+Create Date: 2026-10-16 11:31:26.804115
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e51d0dd72df2'
+down_revision: Union[str, None] = 'a7f46b9b84cb'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Only covers the rows "top-rated" queries read
+    op.create_index(
+        'ix_recipe_ratings_high',
+        'recipe_ratings',
+        ['recipe_id', 'rating'],
+        unique=False,
+        postgresql_where=sa.text('rating >= 4')
+    )
+
+    # Unpurchased items only: the active shopping list lookup
+    op.create_index(
+        'ix_shopping_list_active',
+        'shopping_list_items',
+        ['user_id'],
+        unique=False,
+        postgresql_where=sa.text('is_purchased = false')
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_shopping_list_active', table_name='shopping_list_items')
+    op.drop_index('ix_recipe_ratings_high', table_name='recipe_ratings')
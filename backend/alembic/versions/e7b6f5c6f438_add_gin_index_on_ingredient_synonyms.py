@@ -0,0 +1,33 @@
+"""Add GIN index on ingredients.synonyms
+
+Revision ID: e7b6f5c6f438
+Revises: 1c54c4283136
+Create Date: 2026-10-16 10:05:37.284410
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b6f5c6f438'
+down_revision: Union[str, None] = '1c54c4283136'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # GIN index serves array containment (@>) and overlap (&&) synonym lookups
+    op.create_index(
+        'ix_ingredients_synonyms_gin',
+        'ingredients',
+        ['synonyms'],
+        unique=False,
+        postgresql_using='gin'
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_ingredients_synonyms_gin', table_name='ingredients')
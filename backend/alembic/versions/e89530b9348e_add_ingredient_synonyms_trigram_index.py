@@ -0,0 +1,45 @@
+"""Add trigram index over ingredient synonyms for autocomplete
+
+Revision ID: e89530b9348e
+Revises: 1053b1ed5ff6
+Create Date: 2026-10-16 15:04:52.207316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e89530b9348e'
+down_revision: Union[str, None] = '1053b1ed5ff6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # array_to_string is only STABLE, which index expressions reject; for text[]
+    # the result is deterministic, so wrap it in an IMMUTABLE helper. The '|'
+    # separator can never appear in a normalized query, so substring matches
+    # cannot span two synonyms.
+    op.execute(
+        """
+        CREATE FUNCTION ingredient_synonyms_text(synonyms text[]) RETURNS text
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+            SELECT coalesce(array_to_string(synonyms, '|'), '')
+        $$
+        """
+    )
+
+    op.execute(
+        """
+        CREATE INDEX ix_ingredients_synonyms_trgm ON ingredients
+        USING gin (ingredient_synonyms_text(synonyms) gin_trgm_ops)
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_ingredients_synonyms_trgm', table_name='ingredients')
+    op.execute("DROP FUNCTION IF EXISTS ingredient_synonyms_text(text[])")
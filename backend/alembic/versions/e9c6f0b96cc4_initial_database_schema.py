@@ -19,6 +19,9 @@ depends_on: Union[str, Sequence[str], None] = None
 
 
 def upgrade() -> None:
+    # Indexes are declared inside create_table so each table is created
+    # together with its indexes in the same step
+    
     # Create users table
     op.create_table(
         'users',
@@ -27,10 +30,10 @@ def upgrade() -> None:
         sa.Column('password_hash', sa.String(length=255), nullable=False),
         sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=True),
         sa.Column('updated_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=True),
-        sa.PrimaryKeyConstraint('id')
+        sa.PrimaryKeyConstraint('id'),
+        sa.Index('ix_users_email', 'email', unique=True),
+        sa.Index('ix_users_id', 'id')
     )
-    op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
-    op.create_index(op.f('ix_users_id'), 'users', ['id'], unique=False)
 
     # Create ingredients table
     op.create_table(
@@ -41,10 +44,10 @@ def upgrade() -> None:
         sa.Column('synonyms', sa.ARRAY(sa.Text()), nullable=True),
         sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=True),
         sa.PrimaryKeyConstraint('id'),
-        sa.UniqueConstraint('name')
+        sa.UniqueConstraint('name'),
+        sa.Index('ix_ingredients_id', 'id'),
+        sa.Index('ix_ingredients_name', 'name', unique=True)
     )
-    op.create_index(op.f('ix_ingredients_id'), 'ingredients', ['id'], unique=False)
-    op.create_index(op.f('ix_ingredients_name'), 'ingredients', ['name'], unique=True)
 
     # Create dietary_tags table
     op.create_table(
@@ -52,9 +55,9 @@ def upgrade() -> None:
         sa.Column('id', sa.Integer(), nullable=False),
         sa.Column('name', sa.String(length=50), nullable=False),
         sa.PrimaryKeyConstraint('id'),
-        sa.UniqueConstraint('name')
+        sa.UniqueConstraint('name'),
+        sa.Index('ix_dietary_tags_id', 'id')
     )
-    op.create_index(op.f('ix_dietary_tags_id'), 'dietary_tags', ['id'], unique=False)
 
     # Create recipes table
     op.create_table(
@@ -73,11 +76,11 @@ def upgrade() -> None:
         sa.Column('cache_key', sa.String(length=255), nullable=True),
         sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=True),
         sa.Column('updated_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=True),
-        sa.PrimaryKeyConstraint('id')
+        sa.PrimaryKeyConstraint('id'),
+        sa.Index('ix_recipes_cache_key', 'cache_key'),
+        sa.Index('ix_recipes_cooking_time_minutes', 'cooking_time_minutes'),
+        sa.Index('ix_recipes_id', 'id')
     )
-    op.create_index(op.f('ix_recipes_cache_key'), 'recipes', ['cache_key'], unique=False)
-    op.create_index(op.f('ix_recipes_cooking_time_minutes'), 'recipes', ['cooking_time_minutes'], unique=False)
-    op.create_index(op.f('ix_recipes_id'), 'recipes', ['id'], unique=False)
 
     # Create recipe_ingredients table
     op.create_table(
@@ -92,11 +95,11 @@ def upgrade() -> None:
         sa.CheckConstraint('recipe_id IS NOT NULL', name='recipe_id_not_null'),
         sa.ForeignKeyConstraint(['ingredient_id'], ['ingredients.id'], ondelete='CASCADE'),
         sa.ForeignKeyConstraint(['recipe_id'], ['recipes.id'], ondelete='CASCADE'),
-        sa.PrimaryKeyConstraint('id')
+        sa.PrimaryKeyConstraint('id'),
+        sa.Index('ix_recipe_ingredients_id', 'id'),
+        sa.Index('ix_recipe_ingredients_ingredient_id', 'ingredient_id'),
+        sa.Index('ix_recipe_ingredients_recipe_id', 'recipe_id')
     )
-    op.create_index(op.f('ix_recipe_ingredients_id'), 'recipe_ingredients', ['id'], unique=False)
-    op.create_index(op.f('ix_recipe_ingredients_ingredient_id'), 'recipe_ingredients', ['ingredient_id'], unique=False)
-    op.create_index(op.f('ix_recipe_ingredients_recipe_id'), 'recipe_ingredients', ['recipe_id'], unique=False)
 
     # Create recipe_dietary_tags table
     op.create_table(
@@ -116,9 +119,9 @@ def upgrade() -> None:
         sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=True),
         sa.ForeignKeyConstraint(['recipe_id'], ['recipes.id'], ondelete='CASCADE'),
         sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
-        sa.PrimaryKeyConstraint('user_id', 'recipe_id')
+        sa.PrimaryKeyConstraint('user_id', 'recipe_id'),
+        sa.Index('ix_user_favorites_user_id', 'user_id')
     )
-    op.create_index(op.f('ix_user_favorites_user_id'), 'user_favorites', ['user_id'], unique=False)
 
     # Create shopping_list_items table
     op.create_table(
@@ -132,10 +135,10 @@ def upgrade() -> None:
         sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=True),
         sa.ForeignKeyConstraint(['ingredient_id'], ['ingredients.id'], ondelete='CASCADE'),
         sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
-        sa.PrimaryKeyConstraint('id')
+        sa.PrimaryKeyConstraint('id'),
+        sa.Index('ix_shopping_list_items_id', 'id'),
+        sa.Index('ix_shopping_list_items_user_id', 'user_id')
     )
-    op.create_index(op.f('ix_shopping_list_items_id'), 'shopping_list_items', ['id'], unique=False)
-    op.create_index(op.f('ix_shopping_list_items_user_id'), 'shopping_list_items', ['user_id'], unique=False)
 
     # Create recipe_ratings table
     op.create_table(
@@ -150,44 +153,20 @@ def upgrade() -> None:
         sa.ForeignKeyConstraint(['recipe_id'], ['recipes.id'], ondelete='CASCADE'),
         sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
         sa.PrimaryKeyConstraint('id'),
-        sa.UniqueConstraint('user_id', 'recipe_id')
+        sa.UniqueConstraint('user_id', 'recipe_id'),
+        sa.Index('ix_recipe_ratings_id', 'id'),
+        sa.Index('ix_recipe_ratings_recipe_id', 'recipe_id')
     )
-    op.create_index(op.f('ix_recipe_ratings_id'), 'recipe_ratings', ['id'], unique=False)
-    op.create_index(op.f('ix_recipe_ratings_recipe_id'), 'recipe_ratings', ['recipe_id'], unique=False)
 
 
 def downgrade() -> None:
-    # Drop tables in reverse order
-    op.drop_index(op.f('ix_recipe_ratings_recipe_id'), table_name='recipe_ratings')
-    op.drop_index(op.f('ix_recipe_ratings_id'), table_name='recipe_ratings')
+    # Drop tables in reverse order (DROP TABLE also drops their indexes)
     op.drop_table('recipe_ratings')
-    
-    op.drop_index(op.f('ix_shopping_list_items_user_id'), table_name='shopping_list_items')
-    op.drop_index(op.f('ix_shopping_list_items_id'), table_name='shopping_list_items')
     op.drop_table('shopping_list_items')
-    
-    op.drop_index(op.f('ix_user_favorites_user_id'), table_name='user_favorites')
     op.drop_table('user_favorites')
-    
     op.drop_table('recipe_dietary_tags')
-    
-    op.drop_index(op.f('ix_recipe_ingredients_recipe_id'), table_name='recipe_ingredients')
-    op.drop_index(op.f('ix_recipe_ingredients_ingredient_id'), table_name='recipe_ingredients')
-    op.drop_index(op.f('ix_recipe_ingredients_id'), table_name='recipe_ingredients')
     op.drop_table('recipe_ingredients')
-    
-    op.drop_index(op.f('ix_recipes_id'), table_name='recipes')
-    op.drop_index(op.f('ix_recipes_cooking_time_minutes'), table_name='recipes')
-    op.drop_index(op.f('ix_recipes_cache_key'), table_name='recipes')
     op.drop_table('recipes')
-    
-    op.drop_index(op.f('ix_dietary_tags_id'), table_name='dietary_tags')
     op.drop_table('dietary_tags')
-    
-    op.drop_index(op.f('ix_ingredients_name'), table_name='ingredients')
-    op.drop_index(op.f('ix_ingredients_id'), table_name='ingredients')
     op.drop_table('ingredients')
-    
-    op.drop_index(op.f('ix_users_id'), table_name='users')
-    op.drop_index(op.f('ix_users_email'), table_name='users')
     op.drop_table('users')
@@ -1,16 +1,70 @@
 """
 Custom exceptions and exception handlers for the application.
 """
-from fastapi import Request, status
-from fastapi.responses import JSONResponse
+from fastapi import Request, Response, status
+from fastapi.responses import JSONResponse, ORJSONResponse
 from fastapi.exceptions import RequestValidationError
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 from pydantic import BaseModel
-from typing import Optional, Any, Dict
+from typing import Optional, Any, Dict, Callable
+from functools import lru_cache
 import logging
+import orjson
 
 logger = logging.getLogger(__name__)
 
+@lru_cache(maxsize=256)
+def _error_body(detail: str, error_code: str) -> bytes:
+    """Serialize an error payload; repeated errors reuse the encoded bytes."""
+    return orjson.dumps({"detail": detail, "error_code": error_code})
+
+
+def _json_error(status_code: int, detail: str, error_code: str, headers: Optional[tuple] = None) -> Response:
+    """Build a fresh JSON error response around a cached, pre-encoded body."""
+    return Response(
+        content=_error_body(detail, error_code),
+        status_code=status_code,
+        headers=dict(headers) if headers else None,
+        media_type="application/json"
+    )
+
+
+# Arguments for errors whose payload never changes. Each request gets its own
+# Response (middleware may add headers to it); only the body bytes are shared.
+_DUPLICATE_ENTRY = (
+    status.HTTP_409_CONFLICT, "A record with this information already exists", "DUPLICATE_ENTRY"
+)
+_FK_VIOLATION = (
+    status.HTTP_409_CONFLICT, "A referenced record does not exist", "FK_VIOLATION"
+)
+_CHECK_FAILED = (
+    status.HTTP_400_BAD_REQUEST, "A value failed a database constraint check", "CHECK_FAILED"
+)
+_DATABASE_ERROR = (
+    status.HTTP_500_INTERNAL_SERVER_ERROR,
+    "A database error occurred. Please try again later.",
+    "DATABASE_ERROR"
+)
+_INTERNAL_ERROR = (
+    status.HTTP_500_INTERNAL_SERVER_ERROR,
+    "An unexpected error occurred. Please try again later.",
+    "INTERNAL_ERROR"
+)
+
+# IntegrityError classification by PostgreSQL SQLSTATE
+_INTEGRITY_ERRORS = {
+    "23505": _DUPLICATE_ENTRY,  # unique_violation
+    "23503": _FK_VIOLATION,  # foreign_key_violation
+    "23514": _CHECK_FAILED,  # check_violation
+}
+
+_WWW_AUTHENTICATE = (("WWW-Authenticate", "Bearer"),)
+
+
+def is_foreign_key_violation(exc: IntegrityError) -> bool:
+    """Return True if an IntegrityError was raised by a foreign key constraint."""
+    return getattr(getattr(exc, 'orig', None), 'pgcode', None) == "23503"
+
 
 class ErrorResponse(BaseModel):
     """Standardized error response format."""
@@ -43,7 +97,7 @@ class ResourceNotFoundError(Exception):
         super().__init__(self.detail)
 
 
-async def value_error_handler(request: Request, exc: ValueError) -> JSONResponse:
+async def value_error_handler(request: Request, exc: ValueError) -> Response:
     """
     Handle ValueError exceptions.
     
@@ -52,20 +106,14 @@ async def value_error_handler(request: Request, exc: ValueError) -> JSONResponse
         exc: The ValueError exception
         
     Returns:
-        JSONResponse with error details
+        JSON response with error details (body cached per detail)
     """
-    logger.warning(f"ValueError at {request.url.path}: {str(exc)}")
+    logger.warning("ValueError at %s: %s", request.url.path, exc)
     
-    return JSONResponse(
-        status_code=status.HTTP_400_BAD_REQUEST,
-        content={
-            "detail": str(exc),
-            "error_code": "INVALID_VALUE"
-        }
-    )
+    return _json_error(status.HTTP_400_BAD_REQUEST, str(exc), "INVALID_VALUE")
 
 
-async def sqlalchemy_error_handler(request: Request, exc: SQLAlchemyError) -> JSONResponse:
+async def sqlalchemy_error_handler(request: Request, exc: SQLAlchemyError) -> Response:
     """
     Handle SQLAlchemy database errors.
     
@@ -74,35 +122,24 @@ async def sqlalchemy_error_handler(request: Request, exc: SQLAlchemyError) -> JS
         exc: The SQLAlchemyError exception
         
     Returns:
-        JSONResponse with error details
+        Pre-serialized JSON response with error details
     """
-    logger.error(f"Database error at {request.url.path}: {str(exc)}", exc_info=True)
+    logger.error("Database error at %s: %s", request.url.path, exc, exc_info=True)
     
     # Handle specific database errors
     if isinstance(exc, IntegrityError):
-        # Extract meaningful error message for integrity violations
-        error_msg = str(exc.orig) if hasattr(exc, 'orig') else str(exc)
+        # Classify by SQLSTATE rather than parsing the (possibly localized) message
+        pgcode = getattr(getattr(exc, 'orig', None), 'pgcode', None)
+        integrity_error = _INTEGRITY_ERRORS.get(pgcode)
         
-        if "unique constraint" in error_msg.lower() or "duplicate" in error_msg.lower():
-            return JSONResponse(
-                status_code=status.HTTP_409_CONFLICT,
-                content={
-                    "detail": "A record with this information already exists",
-                    "error_code": "DUPLICATE_ENTRY"
-                }
-            )
+        if integrity_error is not None:
+            return _json_error(*integrity_error)
     
     # Generic database error
-    return JSONResponse(
-        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-        content={
-            "detail": "A database error occurred. Please try again later.",
-            "error_code": "DATABASE_ERROR"
-        }
-    )
+    return _json_error(*_DATABASE_ERROR)
 
 
-async def authentication_error_handler(request: Request, exc: AuthenticationError) -> JSONResponse:
+async def authentication_error_handler(request: Request, exc: AuthenticationError) -> Response:
     """
     Handle authentication errors.
     
@@ -111,21 +148,16 @@ async def authentication_error_handler(request: Request, exc: AuthenticationErro
         exc: The AuthenticationError exception
         
     Returns:
-        JSONResponse with error details
+        JSON response with error details (body cached per detail)
     """
-    logger.warning(f"Authentication error at {request.url.path}: {exc.detail}")
+    logger.warning("Authentication error at %s: %s", request.url.path, exc.detail)
     
-    return JSONResponse(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        content={
-            "detail": exc.detail,
-            "error_code": exc.error_code
-        },
-        headers={"WWW-Authenticate": "Bearer"}
+    return _json_error(
+        status.HTTP_401_UNAUTHORIZED, exc.detail, exc.error_code, _WWW_AUTHENTICATE
     )
 
 
-async def authorization_error_handler(request: Request, exc: AuthorizationError) -> JSONResponse:
+async def authorization_error_handler(request: Request, exc: AuthorizationError) -> Response:
     """
     Handle authorization errors.
     
@@ -134,20 +166,14 @@ async def authorization_error_handler(request: Request, exc: AuthorizationError)
         exc: The AuthorizationError exception
         
     Returns:
-        JSONResponse with error details
+        JSON response with error details (body cached per detail)
     """
-    logger.warning(f"Authorization error at {request.url.path}: {exc.detail}")
+    logger.warning("Authorization error at %s: %s", request.url.path, exc.detail)
     
-    return JSONResponse(
-        status_code=status.HTTP_403_FORBIDDEN,
-        content={
-            "detail": exc.detail,
-            "error_code": exc.error_code
-        }
-    )
+    return _json_error(status.HTTP_403_FORBIDDEN, exc.detail, exc.error_code)
 
 
-async def resource_not_found_handler(request: Request, exc: ResourceNotFoundError) -> JSONResponse:
+async def resource_not_found_handler(request: Request, exc: ResourceNotFoundError) -> Response:
     """
     Handle resource not found errors.
     
@@ -156,17 +182,18 @@ async def resource_not_found_handler(request: Request, exc: ResourceNotFoundErro
         exc: The ResourceNotFoundError exception
         
     Returns:
-        JSONResponse with error details
+        JSON response with error details (body cached per detail)
     """
-    logger.info(f"Resource not found at {request.url.path}: {exc.detail}")
+    logger.info("Resource not found at %s: %s", request.url.path, exc.detail)
     
-    return JSONResponse(
-        status_code=status.HTTP_404_NOT_FOUND,
-        content={
-            "detail": exc.detail,
-            "error_code": exc.error_code
-        }
-    )
+    return _json_error(status.HTTP_404_NOT_FOUND, exc.detail, exc.error_code)
+
+
+def _strip_body_loc(loc: tuple) -> tuple:
+    """Drop the leading "body" segment from a request-body validation loc."""
+    if loc and loc[0] == "body":
+        return loc[1:]
+    return loc
 
 
 async def validation_error_handler(request: Request, exc: RequestValidationError) -> JSONResponse:
@@ -180,15 +207,16 @@ async def validation_error_handler(request: Request, exc: RequestValidationError
     Returns:
         JSONResponse with validation error details
     """
-    logger.warning(f"Validation error at {request.url.path}: {exc.errors()}")
+    raw_errors = exc.errors()
+    logger.warning("Validation error at %s: %s", request.url.path, raw_errors)
     
-    # Format validation errors for better readability
-    errors = {}
-    for error in exc.errors():
-        field = ".".join(str(loc) for loc in error["loc"] if loc != "body")
-        errors[field] = error["msg"]
+    # Format validation errors for better readability ("body" only ever leads the loc)
+    errors = {
+        ".".join(map(str, _strip_body_loc(error["loc"]))): error["msg"]
+        for error in raw_errors
+    }
     
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
         content={
             "detail": "Validation error",
@@ -198,7 +226,7 @@ async def validation_error_handler(request: Request, exc: RequestValidationError
     )
 
 
-async def generic_exception_handler(request: Request, exc: Exception) -> JSONResponse:
+async def generic_exception_handler(request: Request, exc: Exception) -> Response:
     """
     Handle unexpected exceptions.
     
@@ -207,14 +235,27 @@ async def generic_exception_handler(request: Request, exc: Exception) -> JSONRes
         exc: The Exception
         
     Returns:
-        JSONResponse with generic error message
+        Pre-serialized JSON response with generic error message
     """
-    logger.error(f"Unexpected error at {request.url.path}: {str(exc)}", exc_info=True)
+    # Exceptions raised outside the routing layer (e.g. in middleware) skip the
+    # class-specific handlers and land here; dispatch them by MRO before giving up
+    for exc_type in type(exc).__mro__:
+        handler = EXCEPTION_HANDLERS.get(exc_type)
+        if handler is not None:
+            return await handler(request, exc)
     
-    return JSONResponse(
-        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-        content={
-            "detail": "An unexpected error occurred. Please try again later.",
-            "error_code": "INTERNAL_ERROR"
-        }
-    )
+    logger.error("Unexpected error at %s: %s", request.url.path, exc, exc_info=True)
+    
+    return _json_error(*_INTERNAL_ERROR)
+
+
+# Class-specific handlers, keyed by exception type. Registered with the app in
+# one go and reused by generic_exception_handler for MRO dispatch.
+EXCEPTION_HANDLERS: Dict[type, Callable] = {
+    ValueError: value_error_handler,
+    SQLAlchemyError: sqlalchemy_error_handler,
+    AuthenticationError: authentication_error_handler,
+    AuthorizationError: authorization_error_handler,
+    ResourceNotFoundError: resource_not_found_handler,
+    RequestValidationError: validation_error_handler,
+}
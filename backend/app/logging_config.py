@@ -1,12 +1,36 @@
 """
 Logging configuration for the application.
 """
+import atexit
 import logging
+import logging.handlers
+import queue
 import sys
 from typing import Optional
 import os
 
 
+# Accepted LOG_LEVEL values; anything else falls back to INFO
+_LEVELS = {
+    "DEBUG": logging.DEBUG,
+    "INFO": logging.INFO,
+    "WARNING": logging.WARNING,
+    "ERROR": logging.ERROR,
+    "CRITICAL": logging.CRITICAL,
+}
+
+# Background listener that drains queued records to stdout
+_queue_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def _stop_queue_listener() -> None:
+    """Flush and stop the background logging listener, if running."""
+    global _queue_listener
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        _queue_listener = None
+
+
 def setup_logging(log_level: Optional[str] = None) -> None:
     """
     Configure logging for the application.
@@ -20,7 +44,7 @@ def setup_logging(log_level: Optional[str] = None) -> None:
         log_level = os.getenv("LOG_LEVEL", "INFO").upper()
     
     # Convert string to logging level
-    numeric_level = getattr(logging, log_level, logging.INFO)
+    numeric_level = _LEVELS.get(log_level, logging.INFO)
     
     # Create formatter
     formatter = logging.Formatter(
@@ -36,11 +60,21 @@ def setup_logging(log_level: Optional[str] = None) -> None:
     for handler in root_logger.handlers[:]:
         root_logger.removeHandler(handler)
     
-    # Create console handler
+    # Create console handler; it runs on the listener thread so request
+    # handlers only enqueue records and never block on the stdout write
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(numeric_level)
     console_handler.setFormatter(formatter)
-    root_logger.addHandler(console_handler)
+    
+    global _queue_listener
+    _stop_queue_listener()
+    
+    log_queue = queue.SimpleQueue()
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    _queue_listener = logging.handlers.QueueListener(
+        log_queue, console_handler, respect_handler_level=True
+    )
+    _queue_listener.start()
     
     # Set specific loggers
     logging.getLogger("uvicorn").setLevel(logging.INFO)
@@ -50,7 +84,10 @@ def setup_logging(log_level: Optional[str] = None) -> None:
     # Application loggers
     logging.getLogger("app").setLevel(numeric_level)
     
-    logging.info(f"Logging configured with level: {log_level}")
+    logging.info("Logging configured with level: %s", log_level)
+
+
+atexit.register(_stop_queue_listener)
 
 
 def get_logger(name: str) -> logging.Logger:
@@ -73,20 +110,22 @@ class RequestLoggingMiddleware:
     def __init__(self, app):
         self.app = app
         self.logger = get_logger("app.requests")
+        # Resolved once: the middleware stack is built after setup_logging() runs
+        self._enabled = self.logger.isEnabledFor(logging.INFO)
     
     async def __call__(self, scope, receive, send):
-        if scope["type"] == "http":
-            method = scope["method"]
-            path = scope["path"]
-            
-            self.logger.info(f"Incoming request: {method} {path}")
-            
-            async def send_wrapper(message):
-                if message["type"] == "http.response.start":
-                    status_code = message["status"]
-                    self.logger.info(f"Response: {method} {path} - Status: {status_code}")
-                await send(message)
-            
-            await self.app(scope, receive, send_wrapper)
-        else:
+        if not self._enabled or scope["type"] != "http":
             await self.app(scope, receive, send)
+            return
+        
+        method = scope["method"]
+        path = scope["path"]
+        
+        self.logger.info("Incoming request: %s %s", method, path)
+        
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                self.logger.info("Response: %s %s - Status: %s", method, path, message["status"])
+            await send(message)
+        
+        await self.app(scope, receive, send_wrapper)
@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, TIMESTAMP, ForeignKey, CheckConstraint, ARRAY, JSON
+from sqlalchemy import Column, Integer, Float, String, Text, Boolean, TIMESTAMP, ForeignKey, CheckConstraint, Index, UniqueConstraint
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 from app.database import Base
 
 
@@ -27,11 +28,26 @@ class Ingredient(Base):
     category = Column(String(50), nullable=False)
     synonyms = Column(ARRAY(Text), default=[])
     created_at = Column(TIMESTAMP, server_default=func.now())
+    # normalize_ingredient_name(name), maintained on flush by ingredient_service
+    normalized_name = Column(String(100), index=True)
 
     # Relationships
     recipe_ingredients = relationship("RecipeIngredient", back_populates="ingredient")
     shopping_list_items = relationship("ShoppingListItem", back_populates="ingredient")
 
+    __table_args__ = (
+        Index('ix_ingredients_synonyms_gin', 'synonyms', postgresql_using='gin'),
+        Index('ix_ingredients_name_trgm', 'name', postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}),
+        # Starts-with autocomplete: lower(name) LIKE 'q%' as an index range scan
+        Index('ix_ingredients_name_lower_pattern', text('lower(name) text_pattern_ops')),
+        # Substring search over synonyms (autocomplete); see ingredient_synonyms_text
+        Index(
+            'ix_ingredients_synonyms_trgm',
+            text('ingredient_synonyms_text(synonyms) gin_trgm_ops'),
+            postgresql_using='gin'
+        ),
+    )
+
 
 class Recipe(Base):
     __tablename__ = "recipes"
@@ -39,13 +55,18 @@ class Recipe(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False)
     description = Column(Text)
-    instructions = Column(JSON, nullable=False)
+    instructions = Column(JSONB, nullable=False)
     cooking_time_minutes = Column(Integer, nullable=False, index=True)
     difficulty = Column(String(20), nullable=False)
     serving_size = Column(Integer, nullable=False)
     image_url = Column(String(500))
-    nutritional_info = Column(JSON)
+    nutritional_info = Column(JSONB)
     view_count = Column(Integer, default=0)
+    # Denormalized from recipe_ratings; maintained by the recipe_ratings_stats trigger.
+    # The sum and count are exact integers; avg_rating is derived from them.
+    avg_rating = Column(Float, index=True)
+    rating_count = Column(Integer, nullable=False, default=0, server_default='0')
+    rating_sum = Column(Integer, nullable=False, default=0, server_default='0')
     source = Column(String(50), default='groq_ai')
     cache_key = Column(String(255), index=True)
     created_at = Column(TIMESTAMP, server_default=func.now())
@@ -57,6 +78,19 @@ class Recipe(Base):
     favorites = relationship("UserFavorite", back_populates="recipe", cascade="all, delete-orphan")
     ratings = relationship("RecipeRating", back_populates="recipe", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        Index('ix_recipes_name_trgm', 'name', postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}),
+        Index('ix_recipes_nutritional_info', 'nutritional_info', postgresql_using='gin'),
+        Index(
+            'ix_recipes_browse', 'difficulty', 'cooking_time_minutes',
+            postgresql_include=['name', 'image_url', 'view_count']
+        ),
+        # Popular recipes: ORDER BY view_count DESC LIMIT n
+        Index('ix_recipes_view_count', text('view_count DESC')),
+        # Cache lookups and expiry: cache_key = ? AND created_at >= / < threshold
+        Index('ix_recipes_cache_key_created_at', 'cache_key', 'created_at'),
+    )
+
 
 class RecipeIngredient(Base):
     __tablename__ = "recipe_ingredients"
@@ -75,6 +109,7 @@ class RecipeIngredient(Base):
     __table_args__ = (
         CheckConstraint('recipe_id IS NOT NULL', name='recipe_id_not_null'),
         CheckConstraint('ingredient_id IS NOT NULL', name='ingredient_id_not_null'),
+        Index('ix_recipe_ingredients_ingredient_recipe', 'ingredient_id', 'recipe_id', unique=True),
     )
 
 
@@ -103,20 +138,25 @@ class UserFavorite(Base):
     __tablename__ = "user_favorites"
 
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True, index=True)
-    recipe_id = Column(Integer, ForeignKey("recipes.id", ondelete="CASCADE"), primary_key=True)
+    recipe_id = Column(Integer, ForeignKey("recipes.id", ondelete="CASCADE"), primary_key=True, index=True)
     created_at = Column(TIMESTAMP, server_default=func.now())
 
     # Relationships
     user = relationship("User", back_populates="favorites")
     recipe = relationship("Recipe", back_populates="favorites")
 
+    __table_args__ = (
+        # Favorites list: WHERE user_id = ? ORDER BY created_at DESC
+        Index('ix_user_favorites_user_created', 'user_id', text('created_at DESC')),
+    )
+
 
 class ShoppingListItem(Base):
     __tablename__ = "shopping_list_items"
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
-    ingredient_id = Column(Integer, ForeignKey("ingredients.id", ondelete="CASCADE"), nullable=False)
+    ingredient_id = Column(Integer, ForeignKey("ingredients.id", ondelete="CASCADE"), nullable=False, index=True)
     quantity = Column(String(50))
     unit = Column(String(50))
     is_purchased = Column(Boolean, default=False)
@@ -126,12 +166,20 @@ class ShoppingListItem(Base):
     user = relationship("User", back_populates="shopping_list_items")
     ingredient = relationship("Ingredient", back_populates="shopping_list_items")
 
+    __table_args__ = (
+        # Unpurchased items per user; also serves the duplicate check on add
+        Index(
+            'ix_shopping_list_active_ingredient', 'user_id', 'ingredient_id',
+            postgresql_where=text('is_purchased = false')
+        ),
+    )
+
 
 class RecipeRating(Base):
     __tablename__ = "recipe_ratings"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     recipe_id = Column(Integer, ForeignKey("recipes.id", ondelete="CASCADE"), nullable=False, index=True)
     rating = Column(Integer, CheckConstraint('rating >= 1 AND rating <= 5'), nullable=False)
     created_at = Column(TIMESTAMP, server_default=func.now())
@@ -143,4 +191,7 @@ class RecipeRating(Base):
 
     __table_args__ = (
         CheckConstraint('rating >= 1 AND rating <= 5', name='rating_range_check'),
+        # Conflict target for the rating upsert; created by the initial migration
+        UniqueConstraint('user_id', 'recipe_id', name='recipe_ratings_user_id_recipe_id_key'),
+        Index('ix_recipe_ratings_high', 'recipe_id', 'rating', postgresql_where=text('rating >= 4')),
     )
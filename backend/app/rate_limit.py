@@ -0,0 +1,102 @@
+"""
+Rate limiting helpers shared by the application and its routers.
+"""
+import os
+from typing import Optional
+
+from fastapi import Request
+from slowapi import Limiter
+from slowapi.util import get_remote_address
+
+# Number of reverse proxies in front of the app that append the connecting
+# address to X-Forwarded-For / Forwarded. Each trusted proxy adds one entry on
+# the right, so the client is the Nth entry from the right; anything further
+# left was supplied by the client and can be forged. 0 ignores both headers.
+TRUSTED_PROXY_COUNT = int(os.getenv("TRUSTED_PROXY_COUNT", "0"))
+
+# Limit applied to the credential endpoints (register, login)
+AUTH_RATE_LIMIT = "5/15minutes"
+
+
+def _parse_forwarded_element(element: str) -> Optional[str]:
+    """
+    Extract the client address from one element of an RFC 7239 Forwarded header.
+    
+    Args:
+        element: A single comma-separated element of the Forwarded header
+    
+    Returns:
+        Client address, or None if the element carries no usable for= parameter
+    """
+    for part in element.split(";"):
+        name, _, value = part.strip().partition("=")
+        if name.lower() != "for" or not value:
+            continue
+        value = value.strip('"')
+        if value.startswith("["):
+            # Bracketed IPv6, optionally followed by a port
+            return value[1:value.find("]")] or None
+        if value.count(":") == 1:
+            # IPv4 with port
+            value = value.split(":", 1)[0]
+        return value or None
+    return None
+
+
+def _trusted_hop(header_value: str) -> Optional[str]:
+    """
+    Pick the entry recorded by the outermost trusted proxy from a hop list.
+    
+    Args:
+        header_value: Comma-separated X-Forwarded-For or Forwarded value
+    
+    Returns:
+        The TRUSTED_PROXY_COUNT-th entry from the right, or None if the list
+        is shorter than the number of trusted proxies
+    """
+    hops = header_value.split(",")
+    if len(hops) < TRUSTED_PROXY_COUNT:
+        return None
+    return hops[-TRUSTED_PROXY_COUNT].strip() or None
+
+
+def get_client_ip(request: Request) -> str:
+    """
+    Rate-limit key function that resolves the originating client address.
+    
+    Behind TRUSTED_PROXY_COUNT proxies the client is read from the hop those
+    proxies appended to X-Forwarded-For, then Forwarded, never from the
+    client-controlled entries to its left; otherwise (or if neither header
+    is usable) the socket peer address is used.
+    
+    Args:
+        request: The incoming request
+    
+    Returns:
+        Client IP address string
+    """
+    if TRUSTED_PROXY_COUNT > 0:
+        forwarded_for = request.headers.get("x-forwarded-for")
+        if forwarded_for:
+            client_ip = _trusted_hop(forwarded_for)
+            if client_ip:
+                return client_ip
+    
+        forwarded = request.headers.get("forwarded")
+        if forwarded:
+            element = _trusted_hop(forwarded)
+            client_ip = _parse_forwarded_element(element) if element else None
+            if client_ip:
+                return client_ip
+    
+    return get_remote_address(request)
+
+
+# Single limiter shared by the app (app.state.limiter) and every router's
+# decorators. Point RATE_LIMIT_STORAGE_URI at Redis (redis://host:6379) so
+# every worker shares one counter; the in-memory default is per process.
+limiter = Limiter(
+    key_func=get_client_ip,
+    storage_uri=os.getenv("RATE_LIMIT_STORAGE_URI", "memory://"),
+    strategy=os.getenv("RATE_LIMIT_STRATEGY", "moving-window")
+)
@@ -1,6 +1,6 @@
 """
 Routes module for API endpoints.
 """
-from app.routes import auth_routes, ingredient_routes, recipe_routes, user_routes
+from app.routes import auth_routes, ingredient_routes, recipe_routes, user_routes, rating_routes
 
-__all__ = ['auth_routes', 'ingredient_routes', 'recipe_routes', 'user_routes']
+__all__ = ['auth_routes', 'ingredient_routes', 'recipe_routes', 'user_routes', 'rating_routes']
@@ -3,17 +3,13 @@ Authentication API routes for user registration and login.
 """
 from fastapi import APIRouter, Depends, status, Response, Request
 from sqlalchemy.orm import Session
-from slowapi import Limiter
-from slowapi.util import get_remote_address
 from app.database import get_db
 from app.schemas.auth_schemas import UserCreate, UserLogin, AuthResponse, UserResponse
 from app.services import auth_service
 from app.exceptions import AuthenticationError
+from app.rate_limit import AUTH_RATE_LIMIT, limiter
 import logging
 
-# Initialize rate limiter
-limiter = Limiter(key_func=get_remote_address)
-
 # Initialize logger
 logger = logging.getLogger(__name__)
 
@@ -21,8 +17,8 @@ router = APIRouter(prefix="/api/auth", tags=["authentication"])
 
 
 @router.post("/register", response_model=AuthResponse, status_code=status.HTTP_201_CREATED)
-@limiter.limit("5/15minutes")
-async def register(request: Request, user_data: UserCreate, response: Response, db: Session = Depends(get_db)):
+@limiter.limit(AUTH_RATE_LIMIT)
+def register(request: Request, user_data: UserCreate, response: Response, db: Session = Depends(get_db)):
     """
     Register a new user with email and password.
     
@@ -37,15 +33,15 @@ async def register(request: Request, user_data: UserCreate, response: Response,
     Raises:
         ValueError: If email already exists (handled by global exception handler)
     """
-    logger.info(f"Registration attempt for email: {user_data.email}")
+    logger.info("Registration attempt for email: %s", user_data.email)
     
     # Register the user (ValueError will be caught by global handler)
     user = auth_service.register_user(db, user_data.email, user_data.password)
     
-    logger.info(f"User registered successfully: {user.email} (ID: {user.id})")
+    logger.info("User registered successfully: %s (ID: %s)", user.email, user.id)
     
     # Create JWT token
-    token = auth_service.create_access_token(data={"sub": str(user.id)})
+    token = auth_service.create_access_token(data={"sub": str(user.id), "email": user.email})
     
     # Set httpOnly cookie
     response.set_cookie(
@@ -64,8 +60,8 @@ async def register(request: Request, user_data: UserCreate, response: Response,
 
 
 @router.post("/login", response_model=AuthResponse)
-@limiter.limit("5/15minutes")
-async def login(request: Request, user_data: UserLogin, response: Response, db: Session = Depends(get_db)):
+@limiter.limit(AUTH_RATE_LIMIT)
+def login(request: Request, user_data: UserLogin, response: Response, db: Session = Depends(get_db)):
     """
     Authenticate a user with email and password.
     
@@ -80,22 +76,22 @@ async def login(request: Request, user_data: UserLogin, response: Response, db:
     Raises:
         AuthenticationError: If credentials are invalid
     """
-    logger.info(f"Login attempt for email: {user_data.email}")
+    logger.info("Login attempt for email: %s", user_data.email)
     
     # Authenticate user
     user = auth_service.authenticate_user(db, user_data.email, user_data.password)
     
     if not user:
-        logger.warning(f"Failed login attempt for email: {user_data.email}")
+        logger.warning("Failed login attempt for email: %s", user_data.email)
         raise AuthenticationError(
             detail="Invalid email or password",
             error_code="INVALID_CREDENTIALS"
         )
     
-    logger.info(f"User logged in successfully: {user.email} (ID: {user.id})")
+    logger.info("User logged in successfully: %s (ID: %s)", user.email, user.id)
     
     # Create JWT token
-    token = auth_service.create_access_token(data={"sub": str(user.id)})
+    token = auth_service.create_access_token(data={"sub": str(user.id), "email": user.email})
     
     # Set httpOnly cookie
     response.set_cookie(
@@ -1,8 +1,10 @@
 """
 Ingredient API routes for retrieving ingredients and autocomplete functionality.
 """
-from fastapi import APIRouter, Depends, Query, HTTPException, status
+from fastapi import APIRouter, Depends, Query, HTTPException, Request, Response, status
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
+from pydantic import TypeAdapter
 from app.database import get_db
 from app.schemas.ingredient_schemas import (
     IngredientResponse,
@@ -10,13 +12,47 @@ from app.schemas.ingredient_schemas import (
     IngredientsListResponse
 )
 from app.services import ingredient_service
-from typing import Optional
+from app.services.autocomplete_cache import (
+    autocomplete_cache_key,
+    get_cached_autocomplete,
+    set_cached_autocomplete
+)
+from typing import List, Optional
+import hashlib
+import orjson
 
 router = APIRouter(prefix="/api/ingredients", tags=["ingredients"])
 
+# The ingredient list changes rarely; let browsers and proxies reuse it briefly
+INGREDIENTS_CACHE_CONTROL = "public, max-age=300"
+
+# Validates a whole page of ingredient rows in one call instead of per row
+INGREDIENT_LIST_ADAPTER = TypeAdapter(List[IngredientResponse])
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check whether an If-None-Match header matches the given ETag.
+    
+    Args:
+        if_none_match: Raw If-None-Match header value, if any
+        etag: Quoted ETag of the current representation
+        
+    Returns:
+        True if the client's cached copy is still current
+    """
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
 
 @router.get("", response_model=IngredientsListResponse)
 async def get_ingredients(
+    request: Request,
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of records to return"),
     db: Session = Depends(get_db)
@@ -24,7 +60,11 @@ async def get_ingredients(
     """
     Retrieve all ingredients from the database.
     
+    Responses carry an ETag derived from the ingredient count and highest ID,
+    so clients revalidating an unchanged page get a 304 without the list query.
+    
     Args:
+        request: The incoming request
         skip: Number of records to skip (for pagination)
         limit: Maximum number of records to return (max 1000)
         db: Database session
@@ -32,13 +72,21 @@ async def get_ingredients(
     Returns:
         IngredientsListResponse with list of ingredients and total count
     """
+    total, max_id = ingredient_service.get_ingredient_stats(db)
+    version = f"{total}:{max_id}:{skip}:{limit}"
+    etag = f'"{hashlib.md5(version.encode(), usedforsecurity=False).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": INGREDIENTS_CACHE_CONTROL}
+    
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
     ingredients = ingredient_service.get_all_ingredients(db, skip=skip, limit=limit)
-    total = ingredient_service.get_ingredient_count(db)
     
-    return IngredientsListResponse(
-        ingredients=[IngredientResponse.model_validate(ing) for ing in ingredients],
+    response = IngredientsListResponse(
+        ingredients=INGREDIENT_LIST_ADAPTER.validate_python(ingredients),
         total=total
     )
+    return ORJSONResponse(content=response.model_dump(mode="json"), headers=headers)
 
 
 @router.get("/autocomplete", response_model=IngredientAutocompleteResponse)
@@ -65,8 +113,19 @@ async def autocomplete_ingredients(
             detail="Query must be at least 2 characters long"
         )
     
+    # Serve repeated keystrokes from the cache without touching the database
+    cache_key = autocomplete_cache_key(q, limit)
+    cached_body = await get_cached_autocomplete(cache_key)
+    if cached_body is not None:
+        return Response(content=cached_body, media_type="application/json")
+    
     suggestions = ingredient_service.autocomplete_ingredients(db, query=q, limit=limit)
     
-    return IngredientAutocompleteResponse(
-        suggestions=[IngredientResponse.model_validate(ing) for ing in suggestions]
+    # Rows come straight from typed columns, so skip re-validating them
+    response = IngredientAutocompleteResponse.model_construct(
+        suggestions=[IngredientResponse.model_construct(**row._mapping) for row in suggestions]
     )
+    body = orjson.dumps(response.model_dump(mode="json"))
+    await set_cached_autocomplete(cache_key, body)
+    
+    return Response(content=body, media_type="application/json")
@@ -3,14 +3,16 @@ Rating API routes for submitting and retrieving recipe ratings.
 """
 from fastapi import APIRouter, Depends, HTTPException, status, Path
 from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
 from typing import Optional
 import logging
 
 from app.database import get_db
 from app.schemas.rating_schemas import RatingCreate, RatingResponse
 from app.services.rating_service import create_or_update_rating, get_recipe_ratings
-from app.services.auth_middleware import get_current_user, get_current_user_optional
-from app.models import User, Recipe
+from app.services.popular_recipes_cache import clear_popular_cache
+from app.services.auth_middleware import AuthUser, ensure_user_exists, get_current_user, get_current_user_optional
+from app.exceptions import ResourceNotFoundError, is_foreign_key_violation
 
 logger = logging.getLogger(__name__)
 
@@ -18,10 +20,10 @@ router = APIRouter(prefix="/api/recipes", tags=["ratings"])
 
 
 @router.post("/{recipe_id}/ratings", response_model=RatingResponse)
-async def submit_rating(
+def submit_rating(
     recipe_id: int = Path(..., description="Recipe ID"),
     rating_data: RatingCreate = ...,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -41,17 +43,11 @@ async def submit_rating(
     
     Raises:
         HTTPException: If recipe not found (404) or rating invalid (400)
+        AuthenticationError: If the token's user no longer exists (401)
     """
-    # Verify recipe exists
-    recipe = db.query(Recipe).filter(Recipe.id == recipe_id).first()
-    if not recipe:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Recipe with ID {recipe_id} not found"
-        )
-    
     try:
-        # Create or update rating
+        # Create or update rating; the recipe_id foreign key doubles as the
+        # existence check, so no separate recipe lookup is needed
         create_or_update_rating(
             db=db,
             user_id=current_user.id,
@@ -59,14 +55,17 @@ async def submit_rating(
             rating_value=rating_data.rating
         )
         
-        # Get updated rating information
+        # Get updated rating information (also 404s if the recipe is missing)
         average_rating, total_ratings, user_rating = get_recipe_ratings(
             db=db,
             recipe_id=recipe_id,
             user_id=current_user.id
         )
         
-        logger.info(f"User {current_user.id} rated recipe {recipe_id}: {rating_data.rating}")
+        logger.info("User %s rated recipe %s: %s", current_user.id, recipe_id, rating_data.rating)
+        
+        # Cached popular lists carry the recipe's previous average
+        clear_popular_cache()
         
         return RatingResponse(
             average_rating=average_rating,
@@ -74,13 +73,25 @@ async def submit_rating(
             user_rating=user_rating
         )
     
+    except ResourceNotFoundError:
+        raise
+    except IntegrityError as e:
+        db.rollback()
+        if is_foreign_key_violation(e):
+            # Either the recipe or the token's user is gone
+            ensure_user_exists(db, current_user)
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Recipe with ID {recipe_id} not found"
+            )
+        raise
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
     except Exception as e:
-        logger.error(f"Failed to submit rating: {str(e)}", exc_info=True)
+        logger.error("Failed to submit rating: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to submit rating"
@@ -88,9 +99,9 @@ async def submit_rating(
 
 
 @router.get("/{recipe_id}/ratings", response_model=RatingResponse)
-async def get_ratings(
+def get_ratings(
     recipe_id: int = Path(..., description="Recipe ID"),
-    current_user: Optional[User] = Depends(get_current_user_optional),
+    current_user: Optional[AuthUser] = Depends(get_current_user_optional),
     db: Session = Depends(get_db)
 ):
     """
@@ -110,15 +121,7 @@ async def get_ratings(
     Raises:
         HTTPException: If recipe not found (404)
     """
-    # Verify recipe exists
-    recipe = db.query(Recipe).filter(Recipe.id == recipe_id).first()
-    if not recipe:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Recipe with ID {recipe_id} not found"
-        )
-    
-    # Get rating information
+    # Get rating information (raises ResourceNotFoundError -> 404 for unknown recipes)
     user_id = current_user.id if current_user else None
     average_rating, total_ratings, user_rating = get_recipe_ratings(
         db=db,
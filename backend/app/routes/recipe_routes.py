@@ -2,11 +2,17 @@
 Recipe API routes for searching, retrieving, and managing recipes.
 """
 from fastapi import APIRouter, Depends, HTTPException, status, Query, Path
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
 from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
-from typing import Optional, List
+from sqlalchemy import desc, update
+from typing import Optional, List, Dict, Tuple, FrozenSet
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from bisect import bisect_right
+import binascii
 import logging
 import math
+import orjson
 
 from app.database import get_db
 from app.schemas.recipe_schemas import (
@@ -16,119 +22,231 @@ from app.schemas.recipe_schemas import (
     RecipeIngredientResponse,
     PopularRecipesResponse
 )
-from app.models import Recipe, RecipeIngredient, Ingredient, RecipeDietaryTag, DietaryTag, RecipeRating, User
-from app.services.recipe_cache_service import generate_cache_key, get_cached_recipes
+from app.models import Recipe, RecipeIngredient, Ingredient, RecipeRating
+from app.services.recipe_cache_service import (
+    RECIPE_DETAIL_LOADERS,
+    generate_cache_key,
+    get_cached_recipes,
+    has_cached_recipes
+)
 from app.services.recipe_generation_service import generate_recipes
+from app.services.popular_recipes_cache import get_cached_popular, set_cached_popular
 from app.services.ingredient_service import normalize_ingredient_name
-from app.services.auth_middleware import get_current_user_optional
+from app.services.auth_middleware import AuthUser, get_current_user_optional
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/recipes", tags=["recipes"])
 
 
-def calculate_match_percentage(recipe: Recipe, user_ingredients: List[str]) -> float:
+def ingredient_availability(
+    recipe: Recipe,
+    normalized_user_ingredients: FrozenSet[str]
+) -> List[bool]:
+    """
+    Flag which of a recipe's ingredients the user has.
+    
+    Names are read from the stored Ingredient.normalized_name; rows written
+    outside the ORM without it fall back to normalizing at request time. Callers
+    share the result between match scoring and the availability flags.
+    
+    Args:
+        recipe: Recipe object with ingredients loaded
+        normalized_user_ingredients: Set of normalized user ingredient names
+    
+    Returns:
+        One flag per entry of recipe.recipe_ingredients, in the same order
+    """
+    # Popular and detail views pass no ingredients; nothing can be available
+    if not normalized_user_ingredients:
+        return [False] * len(recipe.recipe_ingredients)
+    
+    return [
+        (
+            ri.ingredient.normalized_name
+            or normalize_ingredient_name(ri.ingredient.name)
+        ) in normalized_user_ingredients
+        for ri in recipe.recipe_ingredients
+    ]
+
+
+def calculate_match_percentage(
+    recipe: Recipe,
+    normalized_user_ingredients: FrozenSet[str],
+    availability: Optional[List[bool]] = None
+) -> float:
     """
     Calculate the percentage of recipe ingredients that the user has.
     
     Args:
         recipe: Recipe object with ingredients loaded
-        user_ingredients: List of normalized user ingredient names
+        normalized_user_ingredients: Set of normalized user ingredient names
+        availability: Flags from ingredient_availability, if already computed
     
     Returns:
         Match percentage (0-100)
     """
-    if not recipe.recipe_ingredients:
+    if not recipe.recipe_ingredients or not normalized_user_ingredients:
         return 0.0
     
-    # Normalize user ingredients
-    normalized_user_ingredients = set(
-        normalize_ingredient_name(ing) for ing in user_ingredients
-    )
+    if availability is None:
+        availability = ingredient_availability(recipe, normalized_user_ingredients)
     
     # Count matching ingredients (excluding optional ones for better matching)
-    required_ingredients = [
-        ri for ri in recipe.recipe_ingredients if not ri.is_optional
+    required_flags = [
+        is_available
+        for ri, is_available in zip(recipe.recipe_ingredients, availability)
+        if not ri.is_optional
     ]
     
-    if not required_ingredients:
+    if not required_flags:
         # If all ingredients are optional, use all ingredients
-        required_ingredients = recipe.recipe_ingredients
-    
-    matching_count = sum(
-        1 for ri in required_ingredients
-        if normalize_ingredient_name(ri.ingredient.name) in normalized_user_ingredients
-    )
+        required_flags = availability
     
-    match_percentage = (matching_count / len(required_ingredients)) * 100
+    match_percentage = (sum(required_flags) / len(required_flags)) * 100
     
     return round(match_percentage, 1)
 
 
-def enrich_recipe_with_details(
-    recipe: Recipe,
-    user_ingredients: List[str],
+def _orjson_response(response: BaseModel) -> ORJSONResponse:
+    """
+    Render a built response model with orjson.
+    
+    The models here are assembled from database rows by this module, so
+    returning a Response skips FastAPI re-validating them against
+    response_model and running jsonable_encoder over every nested field.
+    
+    Args:
+        response: Response model to send
+    
+    Returns:
+        ORJSONResponse with the serialized model
+    """
+    return ORJSONResponse(content=response.model_dump(mode="json"))
+
+
+def _search_sort_key(scored_recipe: Tuple[float, Recipe]) -> Tuple[float, int]:
+    """Order search results by match percentage, then ID, both descending."""
+    match_percentage, recipe = scored_recipe
+    return (-match_percentage, -recipe.id)
+
+
+def encode_search_cursor(match_percentage: float, recipe_id: int) -> str:
+    """
+    Encode the position after a search result as an opaque cursor.
+    
+    Args:
+        match_percentage: Match percentage of the last returned recipe
+        recipe_id: ID of the last returned recipe
+    
+    Returns:
+        URL-safe cursor string
+    """
+    return urlsafe_b64encode(orjson.dumps([match_percentage, recipe_id])).decode("ascii")
+
+
+def decode_search_cursor(cursor: str) -> Tuple[float, int]:
+    """
+    Decode a cursor produced by encode_search_cursor.
+    
+    Args:
+        cursor: Cursor string from a previous search response
+    
+    Returns:
+        Tuple of (match_percentage, recipe_id)
+    
+    Raises:
+        HTTPException: If the cursor is malformed (400)
+    """
+    try:
+        match_percentage, recipe_id = orjson.loads(urlsafe_b64decode(cursor.encode("ascii")))
+        return float(match_percentage), int(recipe_id)
+    except (binascii.Error, orjson.JSONDecodeError, UnicodeEncodeError, TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+
+def load_user_ratings(
     db: Session,
+    recipe_ids: List[int],
     user_id: Optional[int] = None
+) -> Dict[int, int]:
+    """
+    Load the user's own ratings for a page of recipes.
+    
+    Rating stats come from the denormalized Recipe.avg_rating and
+    Recipe.rating_count columns, so only the caller's ratings need a query.
+    
+    Args:
+        db: Database session
+        recipe_ids: IDs of the recipes being returned
+        user_id: Optional user ID to include user's ratings
+    
+    Returns:
+        Map of recipe_id -> the user's rating, for recipes they rated
+    """
+    if not user_id or not recipe_ids:
+        return {}
+    
+    return dict(
+        db.query(RecipeRating.recipe_id, RecipeRating.rating).filter(
+            RecipeRating.user_id == user_id,
+            RecipeRating.recipe_id.in_(recipe_ids)
+        ).all()
+    )
+
+
+def enrich_recipe_with_details(
+    recipe: Recipe,
+    normalized_user_ingredients: FrozenSet[str],
+    user_rating_map: Dict[int, int],
+    match_percentage: Optional[float] = None
 ) -> RecipeResponse:
     """
     Enrich a recipe with match percentage, availability flags, and ratings.
     
     Args:
         recipe: Recipe object
-        user_ingredients: List of user's available ingredients
-        db: Database session
-        user_id: Optional user ID to include user's rating
+        normalized_user_ingredients: Set of normalized user ingredient names
+        user_rating_map: The user's ratings per recipe, from load_user_ratings
+        match_percentage: Match percentage if the caller already computed it
     
     Returns:
         RecipeResponse with enriched data
     """
-    # Normalize user ingredients
-    normalized_user_ingredients = set(
-        normalize_ingredient_name(ing) for ing in user_ingredients
-    )
+    availability = ingredient_availability(recipe, normalized_user_ingredients)
     
-    # Calculate match percentage
-    match_percentage = calculate_match_percentage(recipe, user_ingredients)
+    # Calculate match percentage unless the caller ranked by it already
+    if match_percentage is None:
+        match_percentage = calculate_match_percentage(
+            recipe, normalized_user_ingredients, availability
+        )
     
     # Build ingredient list with availability
-    ingredients_response = []
-    for ri in recipe.recipe_ingredients:
-        is_available = normalize_ingredient_name(ri.ingredient.name) in normalized_user_ingredients
-        ingredients_response.append(
-            RecipeIngredientResponse(
-                ingredient_id=ri.ingredient_id,
-                ingredient_name=ri.ingredient.name,
-                quantity=ri.quantity or "",
-                unit=ri.unit or "",
-                is_optional=ri.is_optional,
-                is_available=is_available
-            )
+    build_ingredient = RecipeIngredientResponse.model_construct
+    ingredients_response = [
+        build_ingredient(
+            ingredient_id=ri.ingredient_id,
+            ingredient_name=ri.ingredient.name,
+            quantity=ri.quantity or "",
+            unit=ri.unit or "",
+            is_optional=ri.is_optional,
+            is_available=is_available
         )
+        for ri, is_available in zip(recipe.recipe_ingredients, availability)
+    ]
     
     # Get dietary tags
     dietary_tags = [rt.tag.name for rt in recipe.dietary_tags]
     
-    # Calculate average rating and get user's rating
-    ratings = db.query(
-        func.avg(RecipeRating.rating).label('avg_rating'),
-        func.count(RecipeRating.id).label('total_ratings')
-    ).filter(RecipeRating.recipe_id == recipe.id).first()
-    
-    average_rating = float(ratings.avg_rating) if ratings.avg_rating else None
-    total_ratings = ratings.total_ratings or 0
-    
-    # Get user's rating if user_id provided
-    user_rating = None
-    if user_id:
-        user_rating_obj = db.query(RecipeRating).filter(
-            RecipeRating.user_id == user_id,
-            RecipeRating.recipe_id == recipe.id
-        ).first()
-        if user_rating_obj:
-            user_rating = user_rating_obj.rating
+    # Stats are denormalized on the recipe; the user's rating was loaded for the page
+    user_rating = user_rating_map.get(recipe.id)
     
-    return RecipeResponse(
+    # Fields come straight from typed columns and the maps above, so build the
+    # models without re-running field validation
+    return RecipeResponse.model_construct(
         id=recipe.id,
         name=recipe.name,
         description=recipe.description,
@@ -140,8 +258,8 @@ def enrich_recipe_with_details(
         nutritional_info=recipe.nutritional_info,
         ingredients=ingredients_response,
         dietary_tags=dietary_tags,
-        average_rating=average_rating,
-        total_ratings=total_ratings,
+        average_rating=recipe.avg_rating,
+        total_ratings=recipe.rating_count or 0,
         user_rating=user_rating,
         match_percentage=match_percentage,
         view_count=recipe.view_count,
@@ -149,45 +267,11 @@ def enrich_recipe_with_details(
     )
 
 
-def apply_filters(query, filters: dict):
-    """
-    Apply filters to recipe query.
-    
-    Args:
-        query: SQLAlchemy query object
-        filters: Dictionary of filters
-    
-    Returns:
-        Filtered query
-    """
-    # Apply cooking time filter
-    if "cooking_time_range" in filters and filters["cooking_time_range"]:
-        time_range = filters["cooking_time_range"]
-        if isinstance(time_range, list) and len(time_range) == 2:
-            min_time, max_time = time_range
-            query = query.filter(
-                Recipe.cooking_time_minutes >= min_time,
-                Recipe.cooking_time_minutes <= max_time
-            )
-    
-    # Apply dietary preferences filter
-    if "dietary_preferences" in filters and filters["dietary_preferences"]:
-        dietary_prefs = filters["dietary_preferences"]
-        if isinstance(dietary_prefs, list) and len(dietary_prefs) > 0:
-            # Recipe must have all specified dietary tags
-            for pref in dietary_prefs:
-                query = query.join(RecipeDietaryTag).join(DietaryTag).filter(
-                    func.lower(DietaryTag.name) == pref.lower()
-                )
-    
-    return query
-
-
 @router.post("/search", response_model=RecipeSearchResponse)
 async def search_recipes(
     search_request: RecipeSearchRequest,
     db: Session = Depends(get_db),
-    current_user: Optional[User] = Depends(get_current_user_optional)
+    current_user: Optional[AuthUser] = Depends(get_current_user_optional)
 ):
     """
     Search for recipes based on available ingredients and filters.
@@ -206,13 +290,14 @@ async def search_recipes(
         RecipeSearchResponse with paginated recipes and metadata
     
     Raises:
-        HTTPException: If search fails (500)
+        HTTPException: If the cursor is invalid (400) or search fails (500)
     """
     try:
         ingredients = search_request.ingredients
         filters = search_request.filters or {}
         page = search_request.page
         page_size = search_request.page_size
+        cursor = decode_search_cursor(search_request.cursor) if search_request.cursor else None
         
         # Normalize ingredients
         normalized_ingredients = [
@@ -221,78 +306,87 @@ async def search_recipes(
         
         logger.info(f"Searching recipes for ingredients: {normalized_ingredients}")
         
-        # Generate cache key
-        cache_key = generate_cache_key(normalized_ingredients, filters)
+        # Generate cache key; the names are already lowercased and trimmed
+        cache_key = generate_cache_key(normalized_ingredients, filters, already_normalized=True)
         
-        # Check cache first
-        cached_recipes = get_cached_recipes(db, cache_key)
+        # Check cache first; the filters are applied in the query
+        cached_recipes = get_cached_recipes(db, cache_key, filters=filters)
         
         if cached_recipes:
             logger.info(f"Using {len(cached_recipes)} cached recipes")
-            recipes = cached_recipes
-        else:
+        elif not has_cached_recipes(db, cache_key):
             # Generate new recipes using Groq API
             logger.info("Cache miss - generating new recipes")
-            recipes = generate_recipes(
+            generate_recipes(
                 db=db,
                 ingredients=normalized_ingredients,
                 filters=filters,
                 num_recipes=5
             )
+            # The new recipes are stored under this cache key; read them back
+            # through the same filtered, eager-loading query (the model does
+            # not always honour the requested filters)
+            cached_recipes = get_cached_recipes(db, cache_key, filters=filters)
         
-        # Apply filters to recipes
-        filtered_recipes = recipes
-        
-        # Apply cooking time filter
-        if "cooking_time_range" in filters and filters["cooking_time_range"]:
-            time_range = filters["cooking_time_range"]
-            if isinstance(time_range, list) and len(time_range) == 2:
-                min_time, max_time = time_range
-                filtered_recipes = [
-                    r for r in filtered_recipes
-                    if min_time <= r.cooking_time_minutes <= max_time
-                ]
+        filtered_recipes = cached_recipes or []
         
-        # Apply dietary preferences filter
-        if "dietary_preferences" in filters and filters["dietary_preferences"]:
-            dietary_prefs = set(pref.lower() for pref in filters["dietary_preferences"])
-            filtered_recipes = [
-                r for r in filtered_recipes
-                if dietary_prefs.issubset(set(rt.tag.name.lower() for rt in r.dietary_tags))
-            ]
-        
-        # Sort by match percentage (will be calculated during enrichment)
-        # For now, keep original order
+        # Rank every candidate before paginating so pages follow one global
+        # order by (match percentage, id), both descending
+        normalized_user_set = frozenset(normalized_ingredients)
+        scored_recipes = [
+            (calculate_match_percentage(recipe, normalized_user_set), recipe)
+            for recipe in filtered_recipes
+        ]
+        scored_recipes.sort(key=_search_sort_key)
         
         # Calculate total and pagination
-        total = len(filtered_recipes)
+        total = len(scored_recipes)
         total_pages = math.ceil(total / page_size) if total > 0 else 0
         
-        # Apply pagination
-        start_idx = (page - 1) * page_size
+        # Apply pagination: resume strictly after the cursor position when
+        # given, otherwise fall back to the page number
+        if cursor is not None:
+            cursor_match, cursor_id = cursor
+            start_idx = bisect_right(
+                scored_recipes, (-cursor_match, -cursor_id), key=_search_sort_key
+            )
+            page = start_idx // page_size + 1
+        else:
+            start_idx = (page - 1) * page_size
         end_idx = start_idx + page_size
-        paginated_recipes = filtered_recipes[start_idx:end_idx]
+        page_slice = scored_recipes[start_idx:end_idx]
+        
+        next_cursor = None
+        if page_slice and end_idx < total:
+            last_match, last_recipe = page_slice[-1]
+            next_cursor = encode_search_cursor(last_match, last_recipe.id)
         
         # Enrich recipes with details
         user_id = current_user.id if current_user else None
+        # Only the returned page is enriched; ratings are loaded for it alone
+        user_rating_map = load_user_ratings(
+            db, [recipe.id for _, recipe in page_slice], user_id
+        )
         enriched_recipes = [
-            enrich_recipe_with_details(recipe, normalized_ingredients, db, user_id)
-            for recipe in paginated_recipes
+            enrich_recipe_with_details(
+                recipe, normalized_user_set, user_rating_map, match_percentage
+            )
+            for match_percentage, recipe in page_slice
         ]
         
-        # Sort by match percentage (descending)
-        enriched_recipes.sort(key=lambda r: r.match_percentage or 0, reverse=True)
-        
         logger.info(f"Returning {len(enriched_recipes)} recipes (page {page}/{total_pages})")
         
-        return RecipeSearchResponse(
+        return _orjson_response(RecipeSearchResponse.model_construct(
             recipes=enriched_recipes,
             total=total,
             page=page,
             page_size=page_size,
-            total_pages=total_pages
-        )
+            total_pages=total_pages,
+            next_cursor=next_cursor
+        ))
     
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Recipe search failed: {str(e)}", exc_info=True)
         raise HTTPException(
@@ -305,13 +399,15 @@ async def search_recipes(
 async def get_popular_recipes(
     limit: int = Query(6, ge=1, le=50, description="Number of popular recipes to return"),
     db: Session = Depends(get_db),
-    current_user: Optional[User] = Depends(get_current_user_optional)
+    current_user: Optional[AuthUser] = Depends(get_current_user_optional)
 ):
     """
     Get popular recipes sorted by view count.
     
     This endpoint returns the most viewed recipes, useful for homepage display.
-    Results are sorted by view_count in descending order.
+    Results are sorted by view_count in descending order. The user-independent
+    list is cached in-process for a short TTL per limit, and the caller's own
+    ratings are overlaid on every request.
     
     Args:
         limit: Maximum number of recipes to return (default: 6, max: 50)
@@ -320,35 +416,48 @@ async def get_popular_recipes(
     Returns:
         PopularRecipesResponse with list of popular recipes
     """
-    # Query popular recipes sorted by view count
-    popular_recipes = db.query(Recipe).order_by(
-        desc(Recipe.view_count)
-    ).limit(limit).all()
-    
-    logger.info(f"Retrieved {len(popular_recipes)} popular recipes")
-    
-    # Enrich recipes with details (no user ingredients)
-    user_id = current_user.id if current_user else None
-    enriched_recipes = [
-        enrich_recipe_with_details(recipe, [], db, user_id)
-        for recipe in popular_recipes
-    ]
-    
-    return PopularRecipesResponse(recipes=enriched_recipes)
+    response = get_cached_popular(limit)
+    if response is None:
+        # Query popular recipes sorted by view count
+        popular_recipes = db.query(Recipe).options(*RECIPE_DETAIL_LOADERS).order_by(
+            desc(Recipe.view_count)
+        ).limit(limit).all()
+        
+        logger.info(f"Retrieved {len(popular_recipes)} popular recipes")
+        
+        # Enrich recipes with details (no user ingredients, no user ratings)
+        response = PopularRecipesResponse.model_construct(recipes=[
+            enrich_recipe_with_details(recipe, frozenset(), {})
+            for recipe in popular_recipes
+        ])
+        set_cached_popular(limit, response)
+    
+    user_rating_map = load_user_ratings(
+        db, [recipe.id for recipe in response.recipes], current_user.id if current_user else None
+    )
+    if user_rating_map:
+        # Copy only the recipes the caller rated; the cached models stay shared
+        response = PopularRecipesResponse.model_construct(recipes=[
+            recipe.model_copy(update={"user_rating": user_rating_map[recipe.id]})
+            if recipe.id in user_rating_map else recipe
+            for recipe in response.recipes
+        ])
+    
+    return _orjson_response(response)
 
 
 @router.get("/{recipe_id}", response_model=RecipeResponse)
 async def get_recipe_detail(
     recipe_id: int = Path(..., description="Recipe ID"),
     db: Session = Depends(get_db),
-    current_user: Optional[User] = Depends(get_current_user_optional)
+    current_user: Optional[AuthUser] = Depends(get_current_user_optional)
 ):
     """
     Get detailed information about a specific recipe.
     
     This endpoint:
-    1. Retrieves the recipe with all related data
-    2. Increments the view count
+    1. Increments the view count
+    2. Retrieves the recipe with all related data
     3. Returns full recipe details including ratings
     
     Args:
@@ -361,24 +470,40 @@ async def get_recipe_detail(
     Raises:
         HTTPException: If recipe not found (404)
     """
-    # Query recipe with all relationships
-    recipe = db.query(Recipe).filter(Recipe.id == recipe_id).first()
-    
-    if not recipe:
+    # Increment view count atomically in the database (no lost updates under
+    # concurrent views); RETURNING doubles as the existence check
+    view_count = db.execute(
+        update(Recipe)
+        .where(Recipe.id == recipe_id)
+        .values(view_count=Recipe.view_count + 1)
+        .returning(Recipe.view_count)
+        .execution_options(synchronize_session=False)
+    ).scalar()
+    
+    if view_count is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Recipe with ID {recipe_id} not found"
         )
     
-    # Increment view count
-    recipe.view_count += 1
     db.commit()
-    db.refresh(recipe)
+    
+    # Load the recipe with the relationships the response needs eager-loaded
+    recipe = db.query(Recipe).options(*RECIPE_DETAIL_LOADERS).filter(
+        Recipe.id == recipe_id
+    ).first()
+    
+    if not recipe:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Recipe with ID {recipe_id} not found"
+        )
     
     logger.info(f"Retrieved recipe {recipe_id}: {recipe.name} (views: {recipe.view_count})")
     
     # Enrich recipe with details (no user ingredients, so all marked as unavailable)
     user_id = current_user.id if current_user else None
-    enriched_recipe = enrich_recipe_with_details(recipe, [], db, user_id)
+    user_rating_map = load_user_ratings(db, [recipe.id], user_id)
+    enriched_recipe = enrich_recipe_with_details(recipe, frozenset(), user_rating_map)
     
-    return enriched_recipe
+    return _orjson_response(enriched_recipe)
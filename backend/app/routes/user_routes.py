@@ -1,30 +1,54 @@
 """
 User-related API routes for favorites and shopping list.
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import delete, func, exists, insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
 from typing import List
 from app.database import get_db
-from app.models import User, UserFavorite, Recipe, ShoppingListItem, Ingredient, RecipeRating
+from app.models import UserFavorite, Recipe, ShoppingListItem, Ingredient
 from app.schemas.user_schemas import (
-    FavoriteResponse,
-    FavoriteRecipeResponse,
     FavoritesListResponse,
     ShoppingListItemCreate,
-    ShoppingListItemResponse,
     ShoppingListResponse,
     SuccessResponse
 )
-from app.services.auth_middleware import get_current_user
+from app.services.auth_middleware import AuthUser, ensure_user_exists, get_current_user
+from app.exceptions import is_foreign_key_violation
 
 router = APIRouter(prefix="/api/users", tags=["users"])
 
+# Dialect-specific INSERTs that support ON CONFLICT DO NOTHING
+_UPSERT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+
+def _raise_if_user_deleted(db: Session, current_user: AuthUser, exc: IntegrityError) -> None:
+    """
+    Turn a failed insert into a 401 when the token's user has been deleted.
+    
+    Args:
+        db: Database session
+        current_user: Authenticated user
+        exc: The IntegrityError raised by the insert
+    
+    Raises:
+        AuthenticationError: If a foreign key failed because the user is gone
+    """
+    db.rollback()
+    if is_foreign_key_violation(exc):
+        ensure_user_exists(db, current_user)
+
 
 @router.post("/favorites/{recipe_id}", response_model=SuccessResponse, status_code=status.HTTP_201_CREATED)
 async def add_favorite(
     recipe_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -42,36 +66,39 @@ async def add_favorite(
         HTTPException: If recipe not found (404) or already favorited (400)
     """
     # Check if recipe exists
-    recipe = db.query(Recipe).filter(Recipe.id == recipe_id).first()
-    if not recipe:
+    recipe_exists = db.query(exists().where(Recipe.id == recipe_id)).scalar()
+    if not recipe_exists:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Recipe not found"
         )
     
-    # Check if already favorited
-    existing_favorite = db.query(UserFavorite).filter(
-        UserFavorite.user_id == current_user.id,
-        UserFavorite.recipe_id == recipe_id
-    ).first()
+    # Add to favorites; the (user_id, recipe_id) primary key turns a repeat
+    # into a no-op insert instead of needing a separate lookup
+    upsert = _UPSERT_INSERTS[db.get_bind().dialect.name]
+    try:
+        result = db.execute(
+            upsert(UserFavorite)
+            .values(user_id=current_user.id, recipe_id=recipe_id)
+            .on_conflict_do_nothing(index_elements=["user_id", "recipe_id"])
+        )
+        db.commit()
+    except IntegrityError as e:
+        _raise_if_user_deleted(db, current_user, e)
+        raise
     
-    if existing_favorite:
+    if result.rowcount == 0:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Recipe already in favorites"
         )
     
-    # Add to favorites
-    favorite = UserFavorite(user_id=current_user.id, recipe_id=recipe_id)
-    db.add(favorite)
-    db.commit()
-    
     return SuccessResponse(success=True, message="Recipe added to favorites")
 
 
 @router.get("/favorites", response_model=FavoritesListResponse)
 async def get_favorites(
-    current_user: User = Depends(get_current_user),
+    current_user: AuthUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -84,10 +111,19 @@ async def get_favorites(
     Returns:
         List of favorite recipes with details
     """
-    # Query favorites with recipe details and ratings
+    # Rating stats are denormalized on the recipe, so this is a plain join
     favorites = db.query(
-        Recipe,
-        UserFavorite.created_at.label('favorited_at')
+        Recipe.id,
+        Recipe.name,
+        Recipe.description,
+        Recipe.cooking_time_minutes,
+        Recipe.difficulty,
+        Recipe.serving_size,
+        Recipe.image_url,
+        Recipe.created_at,
+        UserFavorite.created_at.label('favorited_at'),
+        Recipe.avg_rating.label('average_rating'),
+        Recipe.rating_count.label('total_ratings')
     ).join(
         UserFavorite, UserFavorite.recipe_id == Recipe.id
     ).filter(
@@ -96,44 +132,17 @@ async def get_favorites(
         UserFavorite.created_at.desc()
     ).all()
     
-    # Build response with recipe details and average ratings
-    favorite_recipes = []
-    for recipe, favorited_at in favorites:
-        # Calculate average rating
-        rating_stats = db.query(
-            func.avg(RecipeRating.rating).label('avg_rating'),
-            func.count(RecipeRating.id).label('total_ratings')
-        ).filter(
-            RecipeRating.recipe_id == recipe.id
-        ).first()
-        
-        avg_rating = float(rating_stats.avg_rating) if rating_stats.avg_rating else None
-        total_ratings = rating_stats.total_ratings or 0
-        
-        favorite_recipes.append(FavoriteRecipeResponse(
-            id=recipe.id,
-            name=recipe.name,
-            description=recipe.description,
-            cooking_time_minutes=recipe.cooking_time_minutes,
-            difficulty=recipe.difficulty,
-            serving_size=recipe.serving_size,
-            image_url=recipe.image_url,
-            average_rating=avg_rating,
-            total_ratings=total_ratings,
-            created_at=recipe.created_at,
-            favorited_at=favorited_at
-        ))
+    # The projected columns already carry the response field names and JSON
+    # types, so encode the rows directly instead of building response models
+    favorite_recipes = [row._asdict() for row in favorites]
     
-    return FavoritesListResponse(
-        recipes=favorite_recipes,
-        total=len(favorite_recipes)
-    )
+    return ORJSONResponse(content={"recipes": favorite_recipes, "total": len(favorite_recipes)})
 
 
-@router.delete("/favorites/{recipe_id}", response_model=SuccessResponse)
+@router.delete("/favorites/{recipe_id}", status_code=status.HTTP_204_NO_CONTENT, response_class=Response)
 async def remove_favorite(
     recipe_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -145,34 +154,33 @@ async def remove_favorite(
         db: Database session
         
     Returns:
-        Success response
+        Empty 204 response
         
     Raises:
         HTTPException: If favorite not found (404)
     """
-    # Find the favorite
-    favorite = db.query(UserFavorite).filter(
-        UserFavorite.user_id == current_user.id,
-        UserFavorite.recipe_id == recipe_id
-    ).first()
+    # Delete directly; the affected row count tells us whether it existed
+    result = db.execute(
+        delete(UserFavorite).where(
+            UserFavorite.user_id == current_user.id,
+            UserFavorite.recipe_id == recipe_id
+        )
+    )
+    db.commit()
     
-    if not favorite:
+    if result.rowcount == 0:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Recipe not in favorites"
         )
     
-    # Remove from favorites
-    db.delete(favorite)
-    db.commit()
-    
-    return SuccessResponse(success=True, message="Recipe removed from favorites")
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
 @router.post("/shopping-list", response_model=SuccessResponse, status_code=status.HTTP_201_CREATED)
 async def add_to_shopping_list(
     items: ShoppingListItemCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -189,39 +197,42 @@ async def add_to_shopping_list(
     Raises:
         HTTPException: If ingredients not found (404)
     """
-    added_count = 0
-    not_found = []
+    # Resolve every submitted name in one query (case-insensitive)
+    lowered_names = {name.lower() for name in items.ingredients}
+    name_to_id = {
+        name.lower(): ingredient_id
+        for ingredient_id, name in db.query(Ingredient.id, Ingredient.name).filter(
+            func.lower(Ingredient.name).in_(lowered_names)
+        ).all()
+    }
+    not_found = [name for name in items.ingredients if name.lower() not in name_to_id]
     
-    for ingredient_name in items.ingredients:
-        # Find ingredient by name (case-insensitive)
-        ingredient = db.query(Ingredient).filter(
-            func.lower(Ingredient.name) == ingredient_name.lower()
-        ).first()
-        
-        if not ingredient:
-            not_found.append(ingredient_name)
-            continue
-        
-        # Check if already in shopping list
-        existing_item = db.query(ShoppingListItem).filter(
-            ShoppingListItem.user_id == current_user.id,
-            ShoppingListItem.ingredient_id == ingredient.id,
-            ShoppingListItem.is_purchased == False
-        ).first()
-        
-        if existing_item:
-            # Skip if already in list
-            continue
-        
-        # Add to shopping list
-        shopping_item = ShoppingListItem(
-            user_id=current_user.id,
-            ingredient_id=ingredient.id
-        )
-        db.add(shopping_item)
-        added_count += 1
+    # Skip ingredients already waiting in the shopping list
+    ingredient_ids = set(name_to_id.values())
+    existing_ids = set()
+    if ingredient_ids:
+        existing_ids = {
+            ingredient_id
+            for (ingredient_id,) in db.query(ShoppingListItem.ingredient_id).filter(
+                ShoppingListItem.user_id == current_user.id,
+                ShoppingListItem.ingredient_id.in_(ingredient_ids),
+                ShoppingListItem.is_purchased == False
+            ).all()
+        }
     
-    db.commit()
+    # One multi-row INSERT; no ORM objects are needed for the response
+    new_rows = [
+        {"user_id": current_user.id, "ingredient_id": ingredient_id}
+        for ingredient_id in ingredient_ids - existing_ids
+    ]
+    if new_rows:
+        try:
+            db.execute(insert(ShoppingListItem), new_rows)
+            db.commit()
+        except IntegrityError as e:
+            _raise_if_user_deleted(db, current_user, e)
+            raise
+    added_count = len(new_rows)
     
     if not_found:
         message = f"Added {added_count} items. Not found: {', '.join(not_found)}"
@@ -233,7 +244,7 @@ async def add_to_shopping_list(
 
 @router.get("/shopping-list", response_model=ShoppingListResponse)
 async def get_shopping_list(
-    current_user: User = Depends(get_current_user),
+    current_user: AuthUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -246,9 +257,14 @@ async def get_shopping_list(
     Returns:
         List of shopping list items
     """
-    # Query shopping list items with ingredient details
-    items = db.query(
-        ShoppingListItem, Ingredient
+    # Select only the response columns; no ORM objects are built
+    rows = db.query(
+        ShoppingListItem.id,
+        Ingredient.name.label('ingredient_name'),
+        ShoppingListItem.quantity,
+        ShoppingListItem.unit,
+        ShoppingListItem.is_purchased,
+        ShoppingListItem.created_at
     ).join(
         Ingredient, Ingredient.id == ShoppingListItem.ingredient_id
     ).filter(
@@ -257,28 +273,16 @@ async def get_shopping_list(
         ShoppingListItem.created_at.desc()
     ).all()
     
-    # Build response
-    shopping_items = []
-    for item, ingredient in items:
-        shopping_items.append(ShoppingListItemResponse(
-            id=item.id,
-            ingredient_name=ingredient.name,
-            quantity=item.quantity,
-            unit=item.unit,
-            is_purchased=item.is_purchased,
-            created_at=item.created_at
-        ))
+    # Rows map one-to-one onto ShoppingListItemResponse; encode them directly
+    shopping_items = [row._asdict() for row in rows]
     
-    return ShoppingListResponse(
-        items=shopping_items,
-        total=len(shopping_items)
-    )
+    return ORJSONResponse(content={"items": shopping_items, "total": len(shopping_items)})
 
 
-@router.delete("/shopping-list/{item_id}", response_model=SuccessResponse)
+@router.delete("/shopping-list/{item_id}", status_code=status.HTTP_204_NO_CONTENT, response_class=Response)
 async def remove_from_shopping_list(
     item_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -290,25 +294,24 @@ async def remove_from_shopping_list(
         db: Database session
         
     Returns:
-        Success response
+        Empty 204 response
         
     Raises:
         HTTPException: If item not found (404)
     """
-    # Find the shopping list item
-    item = db.query(ShoppingListItem).filter(
-        ShoppingListItem.id == item_id,
-        ShoppingListItem.user_id == current_user.id
-    ).first()
+    # Delete directly, scoped to the owner; no row means missing or not theirs
+    result = db.execute(
+        delete(ShoppingListItem).where(
+            ShoppingListItem.id == item_id,
+            ShoppingListItem.user_id == current_user.id
+        )
+    )
+    db.commit()
     
-    if not item:
+    if result.rowcount == 0:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Shopping list item not found"
         )
     
-    # Remove from shopping list
-    db.delete(item)
-    db.commit()
-    
-    return SuccessResponse(success=True, message="Item removed from shopping list")
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -53,6 +53,11 @@ class RecipeSearchRequest(BaseModel):
     filters: Optional[Dict[str, Any]] = Field(default_factory=dict, description="Optional filters")
     page: int = Field(default=1, ge=1, description="Page number (1-indexed)")
     page_size: int = Field(default=20, ge=1, le=100, description="Number of recipes per page")
+    cursor: Optional[str] = Field(
+        None,
+        max_length=200,
+        description="Opaque cursor from a previous response's next_cursor; takes precedence over page"
+    )
 
 
 class RecipeSearchResponse(BaseModel):
@@ -62,6 +67,7 @@ class RecipeSearchResponse(BaseModel):
     page: int
     page_size: int
     total_pages: int
+    next_cursor: Optional[str] = None
 
 
 class PopularRecipesResponse(BaseModel):
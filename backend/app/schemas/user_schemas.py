@@ -1,7 +1,7 @@
 """
 Pydantic schemas for user-related endpoints (favorites, shopping list).
 """
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional
 from datetime import datetime
 
@@ -12,8 +12,7 @@ class FavoriteResponse(BaseModel):
     recipe_id: int
     created_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 
 class FavoriteRecipeResponse(BaseModel):
@@ -30,8 +29,7 @@ class FavoriteRecipeResponse(BaseModel):
     created_at: datetime
     favorited_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 
 class FavoritesListResponse(BaseModel):
@@ -65,8 +63,7 @@ class ShoppingListItemResponse(BaseModel):
     is_purchased: bool = False
     created_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 
 class ShoppingListResponse(BaseModel):
@@ -1,31 +1,70 @@
 """
 Authentication middleware and dependencies for protected routes.
 """
-from fastapi import Depends, Cookie
+from dataclasses import dataclass
+from fastapi import Cookie
 from typing import Optional
+from sqlalchemy import exists
 from sqlalchemy.orm import Session
-from app.database import get_db
 from app.services import auth_service
 from app.models import User
 from app.exceptions import AuthenticationError
 
 
+@dataclass(frozen=True, slots=True)
+class AuthUser:
+    """
+    Identity of the caller, built from verified token claims.
+    
+    Attributes:
+        id: User ID from the token's sub claim
+        email: User's email, if the token carries it
+    """
+    id: int
+    email: Optional[str] = None
+
+
+def _auth_user_from_token(access_token: str) -> Optional[AuthUser]:
+    """
+    Build the caller's identity from a token without touching the database.
+    
+    Args:
+        access_token: JWT token from the httpOnly cookie
+    
+    Returns:
+        AuthUser if the token is valid and names a user, None otherwise
+    """
+    payload = auth_service.verify_token(access_token)
+    if payload is None:
+        return None
+    
+    try:
+        user_id = int(payload["sub"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    
+    return AuthUser(id=user_id, email=payload.get("email"))
+
+
 async def get_current_user(
-    access_token: Optional[str] = Cookie(None),
-    db: Session = Depends(get_db)
-) -> User:
+    access_token: Optional[str] = Cookie(None)
+) -> AuthUser:
     """
     Dependency to get the current authenticated user from JWT token in cookie.
     
+    The signed token already authenticates the user, so this reads its claims
+    instead of loading the user row. A token stays usable until it expires
+    even if its user is deleted; writes that then fail on the user foreign
+    key call ensure_user_exists to turn that into a 401.
+    
     Args:
         access_token: JWT token from httpOnly cookie
-        db: Database session
-        
+    
     Returns:
-        Current authenticated User object
-        
+        Current authenticated user's identity
+    
     Raises:
-        AuthenticationError: If token is invalid or user not found
+        AuthenticationError: If token is missing or invalid
     """
     if not access_token:
         raise AuthenticationError(
@@ -33,61 +72,51 @@ async def get_current_user(
             error_code="MISSING_TOKEN"
         )
     
-    # Verify token
-    payload = auth_service.verify_token(access_token)
-    if payload is None:
+    auth_user = _auth_user_from_token(access_token)
+    if auth_user is None:
         raise AuthenticationError(
             detail="Invalid or expired token",
             error_code="INVALID_TOKEN"
         )
     
-    # Get user ID from token
-    user_id: str = payload.get("sub")
-    if user_id is None:
-        raise AuthenticationError(
-            detail="Invalid token payload",
-            error_code="INVALID_TOKEN_PAYLOAD"
-        )
+    return auth_user
+
+
+def ensure_user_exists(db: Session, auth_user: AuthUser) -> None:
+    """
+    Reject a token whose user has been deleted since it was issued.
+    
+    Writes call this when an insert hits a foreign key violation, so a stale
+    token is reported as a 401 rather than a missing resource or a 500.
+    
+    Args:
+        db: Database session
+        auth_user: Identity from the token
     
-    # Get user from database
-    user = auth_service.get_user_by_id(db, int(user_id))
-    if user is None:
+    Raises:
+        AuthenticationError: If the user no longer exists
+    """
+    if not db.query(exists().where(User.id == auth_user.id)).scalar():
         raise AuthenticationError(
             detail="User not found",
             error_code="USER_NOT_FOUND"
         )
-    
-    return user
 
 
 async def get_current_user_optional(
-    access_token: Optional[str] = Cookie(None),
-    db: Session = Depends(get_db)
-) -> Optional[User]:
+    access_token: Optional[str] = Cookie(None)
+) -> Optional[AuthUser]:
     """
     Dependency to optionally get the current authenticated user.
     Returns None if not authenticated instead of raising an exception.
     
     Args:
         access_token: JWT token from httpOnly cookie
-        db: Database session
-        
+    
     Returns:
-        Current authenticated User object or None
+        Current authenticated user's identity or None
     """
     if not access_token:
         return None
     
-    # Verify token
-    payload = auth_service.verify_token(access_token)
-    if payload is None:
-        return None
-    
-    # Get user ID from token
-    user_id: str = payload.get("sub")
-    if user_id is None:
-        return None
-    
-    # Get user from database
-    user = auth_service.get_user_by_id(db, int(user_id))
-    return user
+    return _auth_user_from_token(access_token)
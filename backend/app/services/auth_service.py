@@ -1,26 +1,52 @@
 """
 Authentication service for user registration, login, and JWT token management.
 """
+from calendar import timegm
 from datetime import datetime, timedelta
-from typing import Optional
+from functools import lru_cache
+from typing import Optional, Tuple
 from passlib.context import CryptContext
-from jose import JWTError, jwt
-from sqlalchemy.orm import Session
+from sqlalchemy import bindparam, exists, insert, select
+from sqlalchemy.orm import Session, raiseload
 from app.models import User
+import jwt
 import os
-
-# Password hashing configuration
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+import threading
+import time
+
+# Password hashing configuration: new hashes use Argon2id (OWASP minimum
+# parameters); bcrypt stays verifiable and is upgraded on the next login
+pwd_context = CryptContext(
+    schemes=["argon2", "bcrypt"],
+    default="argon2",
+    deprecated="auto",
+    argon2__time_cost=2,
+    argon2__memory_cost=19456,
+    argon2__parallelism=1
+)
+
+# Password hashing is CPU-bound; auth handlers run in the threadpool, so cap
+# concurrent hashes at the core count to leave CPU for other requests during
+# login storms
+_KDF_SLOTS = threading.BoundedSemaphore(os.cpu_count() or 1)
 
 # JWT configuration
 SECRET_KEY = os.getenv("JWT_SECRET", "your-secret-key-change-in-production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_DAYS = int(os.getenv("JWT_EXPIRATION_DAYS", "7"))
 
+# Tokens are always HS256 with the same key, so the key bytes are encoded
+# once rather than on every token issued or verified
+_SIGNING_KEY = SECRET_KEY.encode()
+
+# Statement for get_user_by_id, built once with a bind parameter. Request auth
+# reads the token claims instead, so no request path runs this lookup.
+_USER_BY_ID = select(User).where(User.id == bindparam("user_id"))
+
 
 def hash_password(password: str) -> str:
     """
-    Hash a plain text password using bcrypt.
+    Hash a plain text password using Argon2id.
     
     Args:
         password: Plain text password to hash
@@ -28,7 +54,8 @@ def hash_password(password: str) -> str:
     Returns:
         Hashed password string
     """
-    return pwd_context.hash(password)
+    with _KDF_SLOTS:
+        return pwd_context.hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -42,7 +69,24 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     Returns:
         True if password matches, False otherwise
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    with _KDF_SLOTS:
+        return pwd_context.verify(plain_password, hashed_password)
+
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password and rehash it if its stored hash is outdated.
+    
+    Args:
+        plain_password: Plain text password to verify
+        hashed_password: Hashed password to compare against
+        
+    Returns:
+        Tuple of (matches, new_hash); new_hash is set only when the password
+        matched and the stored hash uses a deprecated scheme or parameters
+    """
+    with _KDF_SLOTS:
+        return pwd_context.verify_and_update(plain_password, hashed_password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -63,12 +107,38 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     else:
         expire = datetime.utcnow() + timedelta(days=ACCESS_TOKEN_EXPIRE_DAYS)
     
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    to_encode.update({"exp": timegm(expire.utctimetuple())})
+    
+    encoded_jwt = jwt.encode(to_encode, _SIGNING_KEY, algorithm=ALGORITHM)
     
     return encoded_jwt
 
 
+@lru_cache(maxsize=4096)
+def _decode_token(token: str) -> Optional[dict]:
+    """
+    Decode and verify a JWT token's signature, caching the result per token.
+    
+    Time claims are deliberately not checked here so cached payloads stay
+    valid; verify_token checks exp and nbf on every call.
+    
+    Args:
+        token: JWT token string to decode
+        
+    Returns:
+        Decoded token payload if the signature is valid, None otherwise
+    """
+    try:
+        return jwt.decode(
+            token,
+            _SIGNING_KEY,
+            algorithms=[ALGORITHM],
+            options={"verify_exp": False, "verify_nbf": False}
+        )
+    except jwt.InvalidTokenError:
+        return None
+
+
 def verify_token(token: str) -> Optional[dict]:
     """
     Verify and decode a JWT token.
@@ -79,11 +149,21 @@ def verify_token(token: str) -> Optional[dict]:
     Returns:
         Decoded token payload if valid, None otherwise
     """
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
-    except JWTError:
+    payload = _decode_token(token)
+    if payload is None:
+        return None
+    
+    now = time.time()
+    exp = payload.get("exp")
+    if not isinstance(exp, (int, float)) or exp <= now:
+        return None
+    
+    nbf = payload.get("nbf")
+    if nbf is not None and (not isinstance(nbf, (int, float)) or nbf > now):
         return None
+    
+    # Hand out a copy so callers cannot modify the cached payload
+    return dict(payload)
 
 
 def register_user(db: Session, email: str, password: str) -> User:
@@ -102,20 +182,23 @@ def register_user(db: Session, email: str, password: str) -> User:
         ValueError: If email already exists
     """
     # Check if user already exists
-    existing_user = db.query(User).filter(User.email == email).first()
-    if existing_user:
+    email_taken = db.query(exists().where(User.email == email)).scalar()
+    if email_taken:
         raise ValueError("Email already registered")
     
     # Create new user with hashed password
     hashed_password = hash_password(password)
-    new_user = User(
-        email=email,
-        password_hash=hashed_password
-    )
-    
-    db.add(new_user)
+    # RETURNING hands back the generated id and timestamps with the insert
+    new_user = db.execute(
+        insert(User)
+        .values(email=email, password_hash=hashed_password)
+        .returning(User)
+    ).scalar_one()
+    
+    # Detach first so the commit doesn't expire the returned values and
+    # force a reload on the next attribute access
+    db.expunge(new_user)
     db.commit()
-    db.refresh(new_user)
     
     return new_user
 
@@ -132,14 +215,21 @@ def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
     Returns:
         User object if authentication successful, None otherwise
     """
-    user = db.query(User).filter(User.email == email).first()
+    # Login only serializes column data; fail loudly rather than lazy-load relationships
+    user = db.query(User).options(raiseload('*')).filter(User.email == email).first()
     
     if not user:
         return None
     
-    if not verify_password(password, user.password_hash):
+    matches, new_hash = verify_and_update_password(password, user.password_hash)
+    if not matches:
         return None
     
+    # Transparently migrate legacy bcrypt hashes to the current scheme
+    if new_hash:
+        user.password_hash = new_hash
+        db.commit()
+    
     return user
 
 
@@ -154,4 +244,4 @@ def get_user_by_id(db: Session, user_id: int) -> Optional[User]:
     Returns:
         User object if found, None otherwise
     """
-    return db.query(User).filter(User.id == user_id).first()
+    return db.execute(_USER_BY_ID, {"user_id": user_id}).scalar_one_or_none()
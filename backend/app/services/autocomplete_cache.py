@@ -0,0 +1,72 @@
+"""
+Read-through Redis cache for ingredient autocomplete responses.
+
+Type-ahead clients send one request per keystroke while the ingredient corpus
+changes rarely, so serialized responses are cached briefly by (query, limit).
+Caching is disabled unless REDIS_URL is set.
+"""
+import logging
+import os
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+REDIS_URL = os.getenv("REDIS_URL")
+AUTOCOMPLETE_CACHE_TTL_SECONDS = int(os.getenv("AUTOCOMPLETE_CACHE_TTL_SECONDS", "300"))
+
+_redis = None
+if REDIS_URL:
+    from redis import asyncio as aioredis
+    _redis = aioredis.from_url(REDIS_URL)
+
+
+def autocomplete_cache_key(query: str, limit: int) -> str:
+    """
+    Build the cache key for an autocomplete request.
+    
+    Args:
+        query: Raw search query
+        limit: Maximum number of suggestions
+        
+    Returns:
+        Cache key string
+    """
+    return f"ac:{query.lower()}:{limit}"
+
+
+async def get_cached_autocomplete(key: str) -> Optional[bytes]:
+    """
+    Fetch a cached autocomplete response body.
+    
+    Args:
+        key: Cache key from autocomplete_cache_key()
+        
+    Returns:
+        Serialized JSON body, or None on a miss, when caching is disabled,
+        or when Redis is unreachable
+    """
+    if _redis is None:
+        return None
+    
+    try:
+        return await _redis.get(key)
+    except Exception as e:
+        logger.warning("Autocomplete cache read failed: %s", e)
+        return None
+
+
+async def set_cached_autocomplete(key: str, body: bytes) -> None:
+    """
+    Store a serialized autocomplete response body with the configured TTL.
+    
+    Args:
+        key: Cache key from autocomplete_cache_key()
+        body: Serialized JSON response body
+    """
+    if _redis is None:
+        return
+    
+    try:
+        await _redis.set(key, body, ex=AUTOCOMPLETE_CACHE_TTL_SECONDS)
+    except Exception as e:
+        logger.warning("Autocomplete cache write failed: %s", e)
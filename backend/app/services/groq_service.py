@@ -4,6 +4,7 @@ Handles API client setup, rate limiting, and error handling.
 """
 import os
 import time
+from collections import deque
 from typing import Optional
 from groq import Groq
 from groq.types.chat import ChatCompletion
@@ -20,30 +21,34 @@ class RateLimiter:
     
     def __init__(self, max_requests_per_minute: int = 30):
         self.max_requests = max_requests_per_minute
-        self.requests = []
+        # Request timestamps, oldest first; appended in time order, so expired
+        # entries are always at the left
+        self.requests = deque(maxlen=max_requests_per_minute)
         self.window_seconds = 60
     
+    def _expire(self, now: float):
+        """Drop timestamps that have left the time window."""
+        while self.requests and now - self.requests[0] >= self.window_seconds:
+            self.requests.popleft()
+    
     def wait_if_needed(self):
         """
         Wait if necessary to stay within rate limits.
         """
-        now = time.time()
+        now = time.monotonic()
         
         # Remove requests older than the time window
-        self.requests = [req_time for req_time in self.requests 
-                        if now - req_time < self.window_seconds]
+        self._expire(now)
         
         # If we've hit the limit, wait until the oldest request expires
         if len(self.requests) >= self.max_requests:
-            oldest_request = min(self.requests)
-            wait_time = self.window_seconds - (now - oldest_request)
+            wait_time = self.window_seconds - (now - self.requests[0])
             if wait_time > 0:
                 logger.info(f"Rate limit reached. Waiting {wait_time:.2f} seconds...")
                 time.sleep(wait_time)
                 # Clean up again after waiting
-                now = time.time()
-                self.requests = [req_time for req_time in self.requests 
-                               if now - req_time < self.window_seconds]
+                now = time.monotonic()
+                self._expire(now)
         
         # Record this request
         self.requests.append(now)
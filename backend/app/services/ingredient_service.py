@@ -3,12 +3,21 @@ Service layer for ingredient management.
 Handles ingredient retrieval, autocomplete, normalization, and synonym matching.
 """
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, func
+from sqlalchemy import and_, case, event, or_, func, select
+from sqlalchemy.engine import Row, RowMapping
+from sqlalchemy.sql.elements import ColumnElement
 from app.models import Ingredient
-from typing import List, Optional
+from functools import lru_cache
+from typing import List, Optional, Tuple
 import re
 
 
+# Compiled once; normalize_ingredient_name runs for every autocomplete query
+_DISALLOWED_CHARS_RE = re.compile(r'[^a-z0-9\s\-]')
+_WHITESPACE_RUN_RE = re.compile(r'\s+')
+
+
+@lru_cache(maxsize=4096)
 def normalize_ingredient_name(name: str) -> str:
     """
     Normalize ingredient name for consistent matching.
@@ -23,15 +32,35 @@ def normalize_ingredient_name(name: str) -> str:
     normalized = name.lower().strip()
     
     # Remove special characters except spaces and hyphens
-    normalized = re.sub(r'[^a-z0-9\s\-]', '', normalized)
+    normalized = _DISALLOWED_CHARS_RE.sub('', normalized)
     
-    # Replace multiple spaces with single space
-    normalized = re.sub(r'\s+', ' ', normalized)
+    # Replace multiple spaces with single space, and trim again in case
+    # removed characters left whitespace at either end
+    normalized = _WHITESPACE_RUN_RE.sub(' ', normalized).strip()
     
     return normalized
 
 
-def get_all_ingredients(db: Session, skip: int = 0, limit: int = 1000) -> List[Ingredient]:
+@event.listens_for(Ingredient, "before_insert")
+@event.listens_for(Ingredient, "before_update")
+def _sync_normalized_name(mapper, connection, target: Ingredient) -> None:
+    """Keep Ingredient.normalized_name in step with name on every flush."""
+    if target.name is not None:
+        target.normalized_name = normalize_ingredient_name(target.name)
+
+
+# Columns served by IngredientResponse; list endpoints select just these as
+# plain rows rather than hydrating ORM instances
+INGREDIENT_RESPONSE_COLUMNS = (
+    Ingredient.id,
+    Ingredient.name,
+    Ingredient.category,
+    Ingredient.synonyms,
+    Ingredient.created_at,
+)
+
+
+def get_all_ingredients(db: Session, skip: int = 0, limit: int = 1000) -> List[RowMapping]:
     """
     Retrieve all ingredients from the database.
     
@@ -41,9 +70,16 @@ def get_all_ingredients(db: Session, skip: int = 0, limit: int = 1000) -> List[I
         limit: Maximum number of records to return
         
     Returns:
-        List of Ingredient objects
+        List of ingredient row mappings with the IngredientResponse fields
     """
-    return db.query(Ingredient).offset(skip).limit(limit).all()
+    # Ordered by id so offset pages (and their ETags) are deterministic
+    stmt = (
+        select(*INGREDIENT_RESPONSE_COLUMNS)
+        .order_by(Ingredient.id)
+        .offset(skip)
+        .limit(limit)
+    )
+    return db.execute(stmt).mappings().all()
 
 
 def get_ingredient_count(db: Session) -> int:
@@ -56,14 +92,32 @@ def get_ingredient_count(db: Session) -> int:
     Returns:
         Total number of ingredients
     """
-    return db.query(Ingredient).count()
+    # Plain COUNT rather than Query.count(), which wraps a SELECT of every column
+    return db.query(func.count(Ingredient.id)).scalar()
+
+
+def get_ingredient_stats(db: Session) -> Tuple[int, Optional[int]]:
+    """
+    Get the ingredient count and highest ingredient ID in one query.
+    
+    Ingredients are only ever added, so together these identify the current
+    version of the ingredient list.
+    
+    Args:
+        db: Database session
+        
+    Returns:
+        Tuple of (total_count, max_id); max_id is None when there are no ingredients
+    """
+    total, max_id = db.query(func.count(Ingredient.id), func.max(Ingredient.id)).one()
+    return total, max_id
 
 
 def autocomplete_ingredients(
     db: Session, 
     query: str, 
     limit: int = 10
-) -> List[Ingredient]:
+) -> List[Row]:
     """
     Search for ingredients matching the query string with autocomplete.
     Implements synonym matching and case-insensitive search.
@@ -74,7 +128,7 @@ def autocomplete_ingredients(
         limit: Maximum number of results to return
         
     Returns:
-        List of matching Ingredient objects
+        List of matching ingredient rows with the IngredientResponse fields
     """
     if not query or len(query) < 2:
         return []
@@ -82,60 +136,67 @@ def autocomplete_ingredients(
     # Normalize the query
     normalized_query = normalize_ingredient_name(query)
     
-    # Create ILIKE pattern for partial matching
+    name_lower = func.lower(Ingredient.name)
+    prefix_pattern = f"{normalized_query}%"
+    
+    # Starts-with matches come first in the ranking and are an index range scan
+    # on lower(name) text_pattern_ops; the normalized query holds no LIKE wildcards
+    prefix_stmt = (
+        select(*INGREDIENT_RESPONSE_COLUMNS)
+        .where(name_lower.like(prefix_pattern))
+        .order_by((name_lower != normalized_query), name_lower)
+        .limit(limit)
+    )
+    results = db.execute(prefix_stmt).all()
+    if len(results) >= limit:
+        return results
+    
+    # Under-filled: fall back to contains matches for the remaining slots
     pattern = f"%{normalized_query}%"
     
-    # Search in ingredient name only (synonym matching done in Python for compatibility)
-    # Using ILIKE for case-insensitive pattern matching
-    results = db.query(Ingredient).filter(
-        func.lower(Ingredient.name).like(pattern)
-    ).limit(limit * 2).all()  # Get more results to filter by synonyms
-    
-    # Filter by synonyms in Python for database compatibility
-    filtered_results = []
-    for ingredient in results:
-        # Check if name matches
-        if normalized_query in ingredient.name.lower():
-            filtered_results.append(ingredient)
-        # Check if any synonym matches
-        elif ingredient.synonyms:
-            for synonym in ingredient.synonyms:
-                if synonym and normalized_query in synonym.lower():
-                    filtered_results.append(ingredient)
-                    break
-    
-    # Limit results
-    results = filtered_results[:limit]
-    
-    # Sort results: exact matches first, then starts-with, then contains
-    def sort_key(ingredient: Ingredient) -> tuple:
-        name_lower = ingredient.name.lower()
-        query_lower = normalized_query
-        
-        # Priority 1: Exact match
-        if name_lower == query_lower:
-            return (0, name_lower)
-        
-        # Priority 2: Starts with query
-        if name_lower.startswith(query_lower):
-            return (1, name_lower)
-        
-        # Priority 3: Contains query
-        if query_lower in name_lower:
-            return (2, name_lower)
-        
-        # Priority 4: Synonym match
-        if ingredient.synonyms:
-            for synonym in ingredient.synonyms:
-                if synonym and query_lower in synonym.lower():
-                    return (3, name_lower)
-        
-        # Default
-        return (4, name_lower)
+    # Using ILIKE on the bare column so the pg_trgm index can serve the wildcard pattern
+    search_filter = Ingredient.name.ilike(pattern)
+    
+    # On PostgreSQL synonyms are matched in the same query through the trigram
+    # index on ingredient_synonyms_text, so LIMIT applies to the final result
+    if db.get_bind().dialect.name == "postgresql":
+        search_filter = or_(
+            search_filter,
+            func.ingredient_synonyms_text(Ingredient.synonyms).ilike(pattern)
+        )
+    
+    # Name-contains matches before synonym-only matches
+    contains_stmt = (
+        select(*INGREDIENT_RESPONSE_COLUMNS)
+        .where(search_filter, name_lower.not_like(prefix_pattern))
+        .order_by(case((name_lower.like(pattern), 0), else_=1), name_lower)
+        .limit(limit - len(results))
+    )
+    return results + db.execute(contains_stmt).all()
+
+
+def _name_matches(normalized_name: str) -> ColumnElement[bool]:
+    """
+    Filter matching ingredients whose normalized name equals the given one.
     
-    sorted_results = sorted(results, key=sort_key)
+    normalized_name is only filled in by the ORM flush listener, so rows
+    written through Core or raw SQL can hold NULL; those fall back to
+    comparing lower(name), as ingredient_availability does. Both branches
+    can use ix_ingredients_normalized_name.
     
-    return sorted_results
+    Args:
+        normalized_name: Output of normalize_ingredient_name
+    
+    Returns:
+        SQL boolean expression over Ingredient
+    """
+    return or_(
+        Ingredient.normalized_name == normalized_name,
+        and_(
+            Ingredient.normalized_name.is_(None),
+            func.lower(Ingredient.name) == normalized_name
+        )
+    )
 
 
 def find_ingredient_by_name(db: Session, name: str) -> Optional[Ingredient]:
@@ -151,9 +212,7 @@ def find_ingredient_by_name(db: Session, name: str) -> Optional[Ingredient]:
     """
     normalized_name = normalize_ingredient_name(name)
     
-    return db.query(Ingredient).filter(
-        func.lower(Ingredient.name) == normalized_name
-    ).first()
+    return db.query(Ingredient).filter(_name_matches(normalized_name)).first()
 
 
 def find_ingredient_by_name_or_synonym(db: Session, name: str) -> Optional[Ingredient]:
@@ -169,17 +228,15 @@ def find_ingredient_by_name_or_synonym(db: Session, name: str) -> Optional[Ingre
     """
     normalized_name = normalize_ingredient_name(name)
     
-    # First try exact name match
-    ingredient = db.query(Ingredient).filter(
-        func.lower(Ingredient.name) == normalized_name
-    ).first()
+    # First try exact name match against the stored normalized name
+    ingredient = db.query(Ingredient).filter(_name_matches(normalized_name)).first()
     
     if ingredient:
         return ingredient
     
-    # Then try synonym match
+    # Then try synonym match (array containment is served by the GIN index)
     ingredient = db.query(Ingredient).filter(
-        Ingredient.synonyms.any(normalized_name)
+        Ingredient.synonyms.contains([normalized_name])
     ).first()
     
     return ingredient
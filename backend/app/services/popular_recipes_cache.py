@@ -0,0 +1,71 @@
+"""
+In-process TTL cache for popular recipe responses.
+
+The homepage requests popular recipes on every load while the ranking only
+shifts as view counts accumulate, so built responses are kept briefly per
+worker keyed by limit. Cached responses are user-independent (user_rating is
+unset); the route overlays the caller's own ratings on every request.
+Submitting a rating clears the cache so the shown averages stay current.
+Set POPULAR_RECIPES_CACHE_TTL_SECONDS=0 to disable.
+"""
+import os
+import time
+from typing import Dict, Hashable, Optional, Tuple
+
+from app.schemas.recipe_schemas import PopularRecipesResponse
+
+POPULAR_RECIPES_CACHE_TTL_SECONDS = float(os.getenv("POPULAR_RECIPES_CACHE_TTL_SECONDS", "60"))
+# One entry per limit the endpoint accepts (1-50), so entries never evict each other
+POPULAR_RECIPES_CACHE_MAX_ENTRIES = 50
+
+# key -> (expiry on the monotonic clock, response)
+_entries: Dict[Hashable, Tuple[float, PopularRecipesResponse]] = {}
+
+
+def get_cached_popular(key: Hashable) -> Optional[PopularRecipesResponse]:
+    """
+    Fetch a cached popular recipes response.
+    
+    Args:
+        key: Cache key, the requested limit
+        
+    Returns:
+        Cached response, or None on a miss or once the entry has expired
+    """
+    entry = _entries.get(key)
+    if entry is None:
+        return None
+    
+    expires_at, response = entry
+    if expires_at <= time.monotonic():
+        _entries.pop(key, None)
+        return None
+    
+    return response
+
+
+def set_cached_popular(key: Hashable, response: PopularRecipesResponse) -> None:
+    """
+    Store a popular recipes response for the configured TTL.
+    
+    Args:
+        key: Cache key, the requested limit
+        response: User-independent response to serve for subsequent requests
+    """
+    if POPULAR_RECIPES_CACHE_TTL_SECONDS <= 0:
+        return
+    
+    now = time.monotonic()
+    if key not in _entries and len(_entries) >= POPULAR_RECIPES_CACHE_MAX_ENTRIES:
+        # Drop expired entries first, then the oldest insertion if still full
+        for stale_key in [k for k, (expires_at, _) in _entries.items() if expires_at <= now]:
+            del _entries[stale_key]
+        if len(_entries) >= POPULAR_RECIPES_CACHE_MAX_ENTRIES:
+            del _entries[next(iter(_entries))]
+    
+    _entries[key] = (now + POPULAR_RECIPES_CACHE_TTL_SECONDS, response)
+
+
+def clear_popular_cache() -> None:
+    """Drop every cached popular recipes response."""
+    _entries.clear()
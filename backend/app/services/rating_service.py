@@ -1,15 +1,55 @@
 """
 Service for managing recipe ratings.
 """
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.orm import Session, raiseload
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.dialects import postgresql
 from typing import Optional, Tuple
 import logging
 
 from app.models import RecipeRating, Recipe
+from app.exceptions import ResourceNotFoundError
 
 logger = logging.getLogger(__name__)
 
+# Read-path statement built once; values are supplied as bind parameters.
+# Returns the recipe's denormalized stats and the user's own rating in one
+# round trip (user_rating is NULL when user_id is NULL or has not rated).
+_RECIPE_RATINGS = select(
+    Recipe.avg_rating,
+    Recipe.rating_count,
+    select(RecipeRating.rating).where(
+        RecipeRating.user_id == bindparam("user_id"),
+        RecipeRating.recipe_id == Recipe.id
+    ).scalar_subquery().label("user_rating")
+).where(Recipe.id == bindparam("recipe_id"))
+
+
+def _refresh_rating_stats(db: Session, recipe_id: int) -> None:
+    """
+    Recompute the denormalized rating stats on a recipe.
+    
+    On PostgreSQL the recipe_ratings_stats trigger keeps these columns in sync;
+    other backends rely on this being called in the writing transaction.
+    
+    Args:
+        db: Database session
+        recipe_id: ID of the recipe whose stats should be refreshed
+    """
+    ratings = db.query(RecipeRating.rating).filter(RecipeRating.recipe_id == recipe_id)
+    db.execute(
+        update(Recipe)
+        .where(Recipe.id == recipe_id)
+        .values(
+            avg_rating=ratings.with_entities(func.avg(RecipeRating.rating)).scalar_subquery(),
+            rating_count=ratings.with_entities(func.count(RecipeRating.id)).scalar_subquery(),
+            rating_sum=ratings.with_entities(
+                func.coalesce(func.sum(RecipeRating.rating), 0)
+            ).scalar_subquery()
+        )
+        .execution_options(synchronize_session=False)
+    )
+
 
 def create_or_update_rating(
     db: Session,
@@ -38,28 +78,50 @@ def create_or_update_rating(
     if not 1 <= rating_value <= 5:
         raise ValueError("Rating must be between 1 and 5")
     
-    # Check if user has already rated this recipe
-    existing_rating = db.query(RecipeRating).filter(
+    if db.get_bind().dialect.name == "postgresql":
+        # Single-statement upsert against the (user_id, recipe_id) unique constraint
+        logger.info("Upserting rating for user %s, recipe %s: %s", user_id, recipe_id, rating_value)
+        stmt = (
+            postgresql.insert(RecipeRating)
+            .values(user_id=user_id, recipe_id=recipe_id, rating=rating_value)
+            .on_conflict_do_update(
+                index_elements=[RecipeRating.user_id, RecipeRating.recipe_id],
+                set_={"rating": rating_value, "updated_at": func.now()}
+            )
+            .returning(RecipeRating)
+            .execution_options(populate_existing=True)
+        )
+        rating = db.execute(stmt).scalar_one()
+        db.commit()
+        return rating
+    
+    # Check if user has already rated this recipe; the rating's user/recipe
+    # relationships are never needed here, so fail loudly on lazy loads
+    existing_rating = db.query(RecipeRating).options(raiseload('*')).filter(
         RecipeRating.user_id == user_id,
         RecipeRating.recipe_id == recipe_id
     ).first()
     
     if existing_rating:
         # Update existing rating
-        logger.info(f"Updating rating for user {user_id}, recipe {recipe_id}: {existing_rating.rating} -> {rating_value}")
+        logger.info("Updating rating for user %s, recipe %s: %s -> %s", user_id, recipe_id, existing_rating.rating, rating_value)
         existing_rating.rating = rating_value
+        db.flush()
+        _refresh_rating_stats(db, recipe_id)
         db.commit()
         db.refresh(existing_rating)
         return existing_rating
     else:
         # Create new rating
-        logger.info(f"Creating new rating for user {user_id}, recipe {recipe_id}: {rating_value}")
+        logger.info("Creating new rating for user %s, recipe %s: %s", user_id, recipe_id, rating_value)
         new_rating = RecipeRating(
             user_id=user_id,
             recipe_id=recipe_id,
             rating=rating_value
         )
         db.add(new_rating)
+        db.flush()
+        _refresh_rating_stats(db, recipe_id)
         db.commit()
         db.refresh(new_rating)
         return new_rating
@@ -83,27 +145,24 @@ def get_recipe_ratings(
         - average_rating: Average rating (1-5) or None if no ratings
         - total_ratings: Total number of ratings
         - user_rating: User's rating if user_id provided and user has rated, else None
+    
+    Raises:
+        ResourceNotFoundError: If the recipe does not exist
     """
-    # Calculate average rating and total count
-    ratings_query = db.query(
-        func.avg(RecipeRating.rating).label('avg_rating'),
-        func.count(RecipeRating.id).label('total_ratings')
-    ).filter(RecipeRating.recipe_id == recipe_id).first()
-    
-    average_rating = float(ratings_query.avg_rating) if ratings_query.avg_rating else None
-    total_ratings = ratings_query.total_ratings or 0
-    
-    # Get user's rating if user_id provided
-    user_rating = None
-    if user_id:
-        user_rating_obj = db.query(RecipeRating).filter(
-            RecipeRating.user_id == user_id,
-            RecipeRating.recipe_id == recipe_id
-        ).first()
-        if user_rating_obj:
-            user_rating = user_rating_obj.rating
-    
-    logger.info(f"Recipe {recipe_id} ratings: avg={average_rating}, total={total_ratings}, user_rating={user_rating}")
+    # Average and count are denormalized onto the recipe row; the user's rating
+    # comes from a correlated subquery, so this is one primary key lookup
+    stats = db.execute(
+        _RECIPE_RATINGS, {"recipe_id": recipe_id, "user_id": user_id or None}
+    ).first()
+    
+    if stats is None:
+        raise ResourceNotFoundError(f"Recipe with ID {recipe_id} not found")
+    
+    average_rating = float(stats.avg_rating) if stats.avg_rating else None
+    total_ratings = stats.rating_count or 0
+    user_rating = stats.user_rating
+    
+    logger.info("Recipe %s ratings: avg=%s, total=%s, user_rating=%s", recipe_id, average_rating, total_ratings, user_rating)
     
     return average_rating, total_ratings, user_rating
 
@@ -3,19 +3,47 @@ Recipe caching service.
 Handles cache key generation, cache lookup, and cache expiration.
 """
 import hashlib
-import json
+import orjson
 from typing import List, Dict, Optional
 from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy.orm import Session, Query, selectinload
+from sqlalchemy import and_, exists, func, select
 
-from app.models import Recipe
+from app.models import Recipe, RecipeIngredient, RecipeDietaryTag, DietaryTag
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Relationships read when building a RecipeResponse; loading them with one
+# IN query per relationship avoids lazy loads for every recipe on a page
+RECIPE_DETAIL_LOADERS = (
+    selectinload(Recipe.recipe_ingredients).selectinload(RecipeIngredient.ingredient),
+    selectinload(Recipe.dietary_tags).selectinload(RecipeDietaryTag.tag),
+)
 
-def generate_cache_key(ingredients: List[str], filters: Optional[Dict] = None) -> str:
+
+def _hash_field(digest: hashlib.blake2b, tag: bytes, value: bytes) -> None:
+    """
+    Feed one tagged, length-prefixed field into a cache key digest.
+    
+    The tag and length prefix keep the byte stream unambiguous whatever the
+    field contains, so no escaping or JSON encoding of the whole key is needed.
+    
+    Args:
+        digest: Hash object being built
+        tag: One-byte field tag
+        value: Encoded field value
+    """
+    digest.update(tag)
+    digest.update(len(value).to_bytes(4, "big"))
+    digest.update(value)
+
+
+def generate_cache_key(
+    ingredients: List[str],
+    filters: Optional[Dict] = None,
+    already_normalized: bool = False
+) -> str:
     """
     Generate a unique cache key from ingredients and filters.
     
@@ -27,41 +55,83 @@ def generate_cache_key(ingredients: List[str], filters: Optional[Dict] = None) -
     Args:
         ingredients: List of ingredient names (should be normalized)
         filters: Optional filters dictionary
+        already_normalized: Skip lowercasing and trimming; the caller has
+            already applied lower().strip() to every ingredient
     
     Returns:
-        Cache key string (SHA256 hash)
+        Cache key string (64-character BLAKE2b hex digest)
     """
-    # Sort ingredients for consistent hashing
-    sorted_ingredients = sorted([ing.lower().strip() for ing in ingredients])
-    
-    # Build cache data structure
-    cache_data = {
-        "ingredients": sorted_ingredients
-    }
-    
-    # Add filters if present
+    # Sort ingredients for consistent hashing, skipping normalization the
+    # caller has already done
+    if not already_normalized:
+        ingredients = [ing.lower().strip() for ing in ingredients]
+    sorted_ingredients = sorted(ingredients)
+    
+    # Not a security boundary, so use the faster BLAKE2b over a canonical
+    # byte stream rather than SHA-256 over a JSON document
+    digest = hashlib.blake2b(digest_size=32)
+    for ingredient in sorted_ingredients:
+        _hash_field(digest, b"i", ingredient.encode())
+    
+    # Add filters if present; their values are free-form JSON, so encode them
     if filters:
         if "dietary_preferences" in filters and filters["dietary_preferences"]:
-            cache_data["dietary_preferences"] = sorted(filters["dietary_preferences"])
+            _hash_field(digest, b"d", orjson.dumps(sorted(filters["dietary_preferences"])))
         
         if "cooking_time_range" in filters and filters["cooking_time_range"]:
-            cache_data["cooking_time_range"] = filters["cooking_time_range"]
-    
-    # Convert to JSON string for hashing
-    cache_string = json.dumps(cache_data, sort_keys=True)
+            _hash_field(
+                digest, b"t",
+                orjson.dumps(filters["cooking_time_range"], option=orjson.OPT_SORT_KEYS)
+            )
     
-    # Generate SHA256 hash
-    cache_key = hashlib.sha256(cache_string.encode()).hexdigest()
+    cache_key = digest.hexdigest()
     
-    logger.debug(f"Generated cache key: {cache_key} for data: {cache_string}")
+    logger.debug("Generated cache key: %s for ingredients: %s, filters: %s", cache_key, sorted_ingredients, filters)
     
     return cache_key
 
 
+def apply_recipe_filters(query: Query, filters: Optional[Dict]) -> Query:
+    """
+    Restrict a recipe query to the search filters.
+    
+    Args:
+        query: SQLAlchemy query over Recipe
+        filters: Optional filters (dietary_preferences, cooking_time_range)
+    
+    Returns:
+        Filtered query
+    """
+    if not filters:
+        return query
+    
+    # Apply cooking time filter
+    time_range = filters.get("cooking_time_range")
+    if isinstance(time_range, list) and len(time_range) == 2:
+        min_time, max_time = time_range
+        query = query.filter(Recipe.cooking_time_minutes.between(min_time, max_time))
+    
+    # Apply dietary preferences filter: the recipe must carry every requested tag
+    dietary_prefs = filters.get("dietary_preferences")
+    if isinstance(dietary_prefs, list) and dietary_prefs:
+        lowered_prefs = {pref.lower() for pref in dietary_prefs}
+        tagged_recipe_ids = (
+            select(RecipeDietaryTag.recipe_id)
+            .join(DietaryTag, DietaryTag.id == RecipeDietaryTag.tag_id)
+            .where(func.lower(DietaryTag.name).in_(lowered_prefs))
+            .group_by(RecipeDietaryTag.recipe_id)
+            .having(func.count(func.distinct(func.lower(DietaryTag.name))) == len(lowered_prefs))
+        )
+        query = query.filter(Recipe.id.in_(tagged_recipe_ids))
+    
+    return query
+
+
 def get_cached_recipes(
     db: Session,
     cache_key: str,
-    max_age_days: int = 7
+    max_age_days: int = 7,
+    filters: Optional[Dict] = None
 ) -> Optional[List[Recipe]]:
     """
     Retrieve cached recipes by cache key if not expired.
@@ -70,6 +140,7 @@ def get_cached_recipes(
         db: Database session
         cache_key: Cache key to lookup
         max_age_days: Maximum age of cached recipes in days (default: 7)
+        filters: Optional search filters the recipes must satisfy
     
     Returns:
         List of Recipe objects if found and not expired, None otherwise
@@ -78,12 +149,13 @@ def get_cached_recipes(
     expiration_threshold = datetime.utcnow() - timedelta(days=max_age_days)
     
     # Query recipes with matching cache key that are not expired
-    recipes = db.query(Recipe).filter(
+    query = db.query(Recipe).options(*RECIPE_DETAIL_LOADERS).filter(
         and_(
             Recipe.cache_key == cache_key,
             Recipe.created_at >= expiration_threshold
         )
-    ).all()
+    )
+    recipes = apply_recipe_filters(query, filters).all()
     
     if recipes and len(recipes) > 0:
         logger.info(f"Cache hit: Found {len(recipes)} recipes for key {cache_key}")
@@ -93,6 +165,28 @@ def get_cached_recipes(
     return None
 
 
+def has_cached_recipes(db: Session, cache_key: str, max_age_days: int = 7) -> bool:
+    """
+    Check whether any unexpired recipes are cached under a key, ignoring filters.
+    
+    Args:
+        db: Database session
+        cache_key: Cache key to lookup
+        max_age_days: Maximum age of cached recipes in days (default: 7)
+    
+    Returns:
+        True if at least one unexpired recipe is cached under the key
+    """
+    expiration_threshold = datetime.utcnow() - timedelta(days=max_age_days)
+    
+    return db.query(
+        exists().where(
+            Recipe.cache_key == cache_key,
+            Recipe.created_at >= expiration_threshold
+        )
+    ).scalar()
+
+
 def invalidate_cache(db: Session, cache_key: str) -> int:
     """
     Invalidate (delete) cached recipes by cache key.
@@ -104,11 +198,11 @@ def invalidate_cache(db: Session, cache_key: str) -> int:
     Returns:
         Number of recipes deleted
     """
-    recipes = db.query(Recipe).filter(Recipe.cache_key == cache_key).all()
-    count = len(recipes)
-    
-    for recipe in recipes:
-        db.delete(recipe)
+    # One bulk DELETE; ingredients, tags, favorites and ratings go with the
+    # recipes through their ON DELETE CASCADE foreign keys
+    count = db.query(Recipe).filter(
+        Recipe.cache_key == cache_key
+    ).delete(synchronize_session=False)
     
     db.commit()
     
@@ -117,32 +211,47 @@ def invalidate_cache(db: Session, cache_key: str) -> int:
     return count
 
 
-def cleanup_expired_cache(db: Session, max_age_days: int = 7) -> int:
+def cleanup_expired_cache(
+    db: Session,
+    max_age_days: int = 7,
+    batch_size: int = 10_000
+) -> int:
     """
     Clean up expired cached recipes.
     
+    Deletes in batches, committing after each, so memory use and lock time
+    stay bounded however many recipes have expired, and an interrupted run
+    keeps the batches it already finished.
+    
     Args:
         db: Database session
         max_age_days: Maximum age of cached recipes in days
+        batch_size: Maximum number of recipes deleted per transaction
     
     Returns:
         Number of recipes deleted
     """
     expiration_threshold = datetime.utcnow() - timedelta(days=max_age_days)
     
-    expired_recipes = db.query(Recipe).filter(
-        and_(
+    expired_batch = (
+        select(Recipe.id)
+        .where(
             Recipe.cache_key.isnot(None),
             Recipe.created_at < expiration_threshold
         )
-    ).all()
-    
-    count = len(expired_recipes)
-    
-    for recipe in expired_recipes:
-        db.delete(recipe)
-    
-    db.commit()
+        .limit(batch_size)
+    )
+    
+    count = 0
+    while True:
+        deleted = db.query(Recipe).filter(
+            Recipe.id.in_(expired_batch)
+        ).delete(synchronize_session=False)
+        db.commit()
+        
+        count += deleted
+        if deleted < batch_size:
+            break
     
     logger.info(f"Cleaned up {count} expired cached recipes")
     
@@ -159,23 +268,18 @@ def get_cache_stats(db: Session) -> Dict:
     Returns:
         Dictionary with cache statistics
     """
-    total_cached = db.query(Recipe).filter(
-        Recipe.cache_key.isnot(None)
-    ).count()
-    
     expiration_threshold = datetime.utcnow() - timedelta(days=7)
-    valid_cached = db.query(Recipe).filter(
-        and_(
-            Recipe.cache_key.isnot(None),
-            Recipe.created_at >= expiration_threshold
-        )
-    ).count()
     
-    expired_cached = total_cached - valid_cached
-    
-    unique_cache_keys = db.query(Recipe.cache_key).filter(
+    # All three counts come from one pass over the cached recipes
+    total_cached, valid_cached, unique_cache_keys = db.query(
+        func.count(),
+        func.count().filter(Recipe.created_at >= expiration_threshold),
+        func.count(func.distinct(Recipe.cache_key))
+    ).filter(
         Recipe.cache_key.isnot(None)
-    ).distinct().count()
+    ).one()
+    
+    expired_cached = total_cached - valid_cached
     
     return {
         "total_cached_recipes": total_cached,
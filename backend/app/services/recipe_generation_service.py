@@ -138,6 +138,7 @@ def store_recipe_in_db(
     db.flush()  # Get recipe ID
     
     # Store recipe ingredients
+    stored_ingredient_ids = set()
     for ingredient_data in recipe_data["ingredients"]:
         ingredient_name = ingredient_data["name"].lower().strip()
         
@@ -154,6 +155,11 @@ def store_recipe_in_db(
             db.add(ingredient)
             db.flush()
         
+        # Skip repeated ingredients (e.g. a name and its synonym both listed)
+        if ingredient.id in stored_ingredient_ids:
+            continue
+        stored_ingredient_ids.add(ingredient.id)
+        
         # Create recipe-ingredient relationship
         recipe_ingredient = RecipeIngredient(
             recipe_id=recipe.id,
@@ -255,7 +261,7 @@ def generate_recipes(
         
         # Generate cache key (will be implemented in next subtask)
         from app.services.recipe_cache_service import generate_cache_key
-        cache_key = generate_cache_key(normalized_ingredients, filters)
+        cache_key = generate_cache_key(normalized_ingredients, filters, already_normalized=True)
         
         # Store recipes in database
         stored_recipes = []
@@ -2,6 +2,10 @@
 Unit tests for authentication service.
 """
 import pytest
+from base64 import urlsafe_b64encode
+from datetime import timedelta
+import jwt
+import time
 from app.services import auth_service
 
 
@@ -15,7 +19,7 @@ class TestPasswordHashing:
         
         assert hashed != password
         assert len(hashed) > 0
-        assert hashed.startswith("$2b$")  # bcrypt hash prefix
+        assert hashed.startswith("$argon2id$")  # Argon2id hash prefix
     
     def test_verify_password_correct(self):
         """Test password verification with correct password."""
@@ -63,6 +67,72 @@ class TestJWTTokens:
         payload = auth_service.verify_token(invalid_token)
         
         assert payload is None
+    
+    def test_verify_token_tampered_signature(self):
+        """Test that a token with an altered payload is rejected."""
+        token = auth_service.create_access_token({"sub": "123"})
+        header, _, signature = token.split(".")
+        forged_payload = urlsafe_b64encode(b'{"sub":"1","exp":9999999999}').rstrip(b"=").decode()
+        
+        assert auth_service.verify_token(f"{header}.{forged_payload}.{signature}") is None
+    
+    def test_verify_token_expired(self):
+        """Test that expired tokens are rejected on every verification."""
+        token = auth_service.create_access_token({"sub": "123"}, timedelta(seconds=-1))
+        
+        assert auth_service.verify_token(token) is None
+        assert auth_service.verify_token(token) is None
+    
+    def test_verify_token_expires_while_cached(self, monkeypatch):
+        """Test that a cached token is rejected once its expiry passes."""
+        token = auth_service.create_access_token({"sub": "123"}, timedelta(seconds=60))
+        assert auth_service.verify_token(token) is not None
+        
+        now = time.time()
+        monkeypatch.setattr(auth_service.time, "time", lambda: now + 120)
+        hits = auth_service._decode_token.cache_info().hits
+        
+        assert auth_service.verify_token(token) is None
+        assert auth_service._decode_token.cache_info().hits == hits + 1
+    
+    def test_verify_token_becomes_valid_at_nbf(self, monkeypatch):
+        """Test that rejecting an early token does not cache the rejection."""
+        now = time.time()
+        token = auth_service.create_access_token({"sub": "123", "nbf": int(now) + 60})
+        assert auth_service.verify_token(token) is None
+        
+        monkeypatch.setattr(auth_service.time, "time", lambda: now + 120)
+        
+        assert auth_service.verify_token(token)["sub"] == "123"
+    
+    def test_verify_token_not_yet_valid(self):
+        """Test that a token whose nbf lies in the future is rejected."""
+        token = auth_service.create_access_token({"sub": "123", "nbf": 9999999999})
+        
+        assert auth_service.verify_token(token) is None
+    
+    def test_verify_token_rejects_unsigned(self):
+        """Test that an alg=none token is rejected."""
+        token = jwt.encode({"sub": "123", "exp": 9999999999}, None, algorithm="none")
+        
+        assert auth_service.verify_token(token) is None
+    
+    def test_verify_token_rejects_other_algorithm(self):
+        """Test that the cached decode still pins HS256."""
+        token = jwt.encode(
+            {"sub": "123", "exp": 9999999999}, auth_service.SECRET_KEY, algorithm="HS512"
+        )
+        
+        assert auth_service.verify_token(token) is None
+    
+    def test_verify_token_returns_copy(self):
+        """Test that modifying a returned payload does not affect later calls."""
+        token = auth_service.create_access_token({"sub": "123"})
+        
+        payload = auth_service.verify_token(token)
+        payload["sub"] = "456"
+        
+        assert auth_service.verify_token(token)["sub"] == "123"
 
 
 class TestUserRegistration:
@@ -79,7 +149,7 @@ class TestUserRegistration:
         assert user.id is not None
         assert user.email == email
         assert user.password_hash != password
-        assert user.password_hash.startswith("$2b$")
+        assert user.password_hash.startswith("$argon2id$")
     
     def test_register_user_duplicate_email(self, db_session):
         """Test registration with duplicate email raises ValueError."""
@@ -112,6 +182,21 @@ class TestUserAuthentication:
         assert authenticated_user.id == registered_user.id
         assert authenticated_user.email == email
     
+    def test_authenticate_user_upgrades_bcrypt_hash(self, db_session):
+        """Test that a legacy bcrypt hash is replaced after a successful login."""
+        email = "test@example.com"
+        password = "password123"
+        
+        user = auth_service.register_user(db_session, email, password)
+        user.password_hash = auth_service.pwd_context.handler("bcrypt").hash(password)
+        db_session.commit()
+        
+        authenticated_user = auth_service.authenticate_user(db_session, email, password)
+        
+        assert authenticated_user is not None
+        assert authenticated_user.password_hash.startswith("$argon2id$")
+        assert auth_service.verify_password(password, authenticated_user.password_hash) is True
+    
     def test_authenticate_user_wrong_password(self, db_session):
         """Test authentication with incorrect password."""
         email = "test@example.com"
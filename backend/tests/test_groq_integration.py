@@ -157,7 +157,7 @@ class TestCacheKeyGeneration:
         ingredients = ["chicken", "rice"]
         key = generate_cache_key(ingredients)
         
-        # SHA256 produces 64 character hex string
+        # 32-byte BLAKE2b digest produces 64 character hex string
         assert len(key) == 64
         assert all(c in "0123456789abcdef" for c in key)
 
@@ -0,0 +1,123 @@
+"""
+Integration tests for ingredient endpoints.
+Tests conditional requests on the ingredient list.
+"""
+import pytest
+from sqlalchemy import create_engine, Column, Integer, String, TIMESTAMP, JSON
+from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.sql import func
+from fastapi.testclient import TestClient
+from app.main import app
+from app.database import get_db
+
+# Use in-memory SQLite database for testing
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test_ingredient_endpoints.db"
+
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Create a separate Base for testing
+TestBase = declarative_base()
+
+
+class Ingredient(TestBase):
+    """Test Ingredient model."""
+    __tablename__ = "ingredients"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(100), unique=True, nullable=False, index=True)
+    category = Column(String(50), nullable=False)
+    synonyms = Column(JSON)
+    normalized_name = Column(String(100), index=True)
+    created_at = Column(TIMESTAMP, server_default=func.now())
+
+
+@pytest.fixture(scope="function")
+def db_session():
+    """Create a fresh database with test data for each test."""
+    TestBase.metadata.create_all(bind=engine)
+    db = TestingSessionLocal()
+    
+    db.add_all([
+        Ingredient(id=1, name="chicken", category="meat", normalized_name="chicken"),
+        Ingredient(id=2, name="rice", category="grain", normalized_name="rice"),
+    ])
+    db.commit()
+    
+    try:
+        yield db
+    finally:
+        db.close()
+        TestBase.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture(scope="function")
+def client(db_session):
+    """Create a test client with database session override."""
+    def override_get_db():
+        try:
+            yield db_session
+        finally:
+            pass
+    
+    app.dependency_overrides[get_db] = override_get_db
+    with TestClient(app) as test_client:
+        yield test_client
+    app.dependency_overrides.clear()
+
+
+class TestIngredientListETag:
+    """Test ETag revalidation of the ingredient list."""
+    
+    def test_list_returns_etag(self, client, db_session):
+        """Test that the ingredient list carries an ETag and cache headers."""
+        response = client.get("/api/ingredients")
+        
+        assert response.status_code == 200
+        assert response.headers["etag"]
+        assert response.headers["cache-control"] == "public, max-age=300"
+        assert response.json()["total"] == 2
+    
+    def test_matching_if_none_match_returns_304(self, client, db_session):
+        """Test that revalidating with the returned ETag gets an empty 304."""
+        etag = client.get("/api/ingredients").headers["etag"]
+        
+        response = client.get("/api/ingredients", headers={"If-None-Match": etag})
+        
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+    
+    @pytest.mark.parametrize("if_none_match", ["W/{etag}", '"stale", {etag}', "*"])
+    def test_if_none_match_forms_return_304(self, client, db_session, if_none_match):
+        """Test weak, list and wildcard If-None-Match values."""
+        etag = client.get("/api/ingredients").headers["etag"]
+        
+        response = client.get(
+            "/api/ingredients",
+            headers={"If-None-Match": if_none_match.format(etag=etag)}
+        )
+        
+        assert response.status_code == 304
+    
+    def test_etag_changes_after_insert(self, client, db_session):
+        """Test that adding an ingredient invalidates the previous ETag."""
+        etag = client.get("/api/ingredients").headers["etag"]
+        
+        db_session.add(Ingredient(id=3, name="tomato", category="vegetable", normalized_name="tomato"))
+        db_session.commit()
+        
+        response = client.get("/api/ingredients", headers={"If-None-Match": etag})
+        
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+        assert response.json()["total"] == 3
+    
+    def test_etag_differs_per_page(self, client, db_session):
+        """Test that different pages of the list do not share an ETag."""
+        first = client.get("/api/ingredients?limit=1").headers["etag"]
+        second = client.get("/api/ingredients?skip=1&limit=1").headers["etag"]
+        
+        assert first != second
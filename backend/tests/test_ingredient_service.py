@@ -28,6 +28,12 @@ class Ingredient(TestBase):
     name = Column(String(100), unique=True, nullable=False, index=True)
     category = Column(String(50), nullable=False)
     synonyms = Column(String(500))  # Store as comma-separated string for SQLite
+    # Populated like the app's flush listener, which only targets the real model
+    normalized_name = Column(
+        String(100),
+        index=True,
+        default=lambda ctx: ingredient_service.normalize_ingredient_name(ctx.get_current_parameters()["name"])
+    )
     created_at = Column(TIMESTAMP, server_default=func.now())
 
 
@@ -80,6 +86,12 @@ class TestIngredientNormalization:
         result = ingredient_service.normalize_ingredient_name("chicken!")
         assert result == "chicken"
     
+    def test_normalize_trims_after_removing_special_chars(self):
+        """Test that whitespace left at the ends by removed characters is trimmed."""
+        result = ingredient_service.normalize_ingredient_name("! chicken (raw)*")
+        assert result == "chicken raw"
+        assert result == result.lower().strip()
+    
     def test_normalize_multiple_spaces(self):
         """Test that normalization replaces multiple spaces with single space."""
         result = ingredient_service.normalize_ingredient_name("chicken   breast")
@@ -160,6 +172,12 @@ class TestIngredientRetrieval:
         count = ingredient_service.get_ingredient_count(db_session)
         assert count == 10
     
+    def test_get_ingredient_stats(self, db_session):
+        """Test getting the ingredient count and highest ID together."""
+        total, max_id = ingredient_service.get_ingredient_stats(db_session)
+        assert total == 10
+        assert max_id == 10
+    
     def test_find_ingredient_by_name(self, db_session):
         """Test finding ingredient by exact name."""
         result = ingredient_service.find_ingredient_by_name(db_session, "chicken")
@@ -172,6 +190,21 @@ class TestIngredientRetrieval:
         assert result is not None
         assert result.name == "chicken"
     
+    def test_find_ingredient_by_name_without_normalized_name(self, db_session):
+        """Test that rows inserted outside the ORM, with no normalized_name, are still found."""
+        db_session.execute(Ingredient.__table__.insert().values(
+            id=11, name="Paprika", category="seasoning", synonyms="", normalized_name=None
+        ))
+        db_session.commit()
+        
+        result = ingredient_service.find_ingredient_by_name(db_session, "paprika")
+        assert result is not None
+        assert result.id == 11
+        
+        result = ingredient_service.find_ingredient_by_name_or_synonym(db_session, "PAPRIKA")
+        assert result is not None
+        assert result.id == 11
+    
     def test_find_ingredient_by_name_not_found(self, db_session):
         """Test finding non-existent ingredient returns None."""
         result = ingredient_service.find_ingredient_by_name(db_session, "nonexistent")
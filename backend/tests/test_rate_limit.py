@@ -0,0 +1,73 @@
+"""
+Unit tests for the rate-limit client address resolution.
+"""
+import pytest
+from starlette.requests import Request
+
+from app import rate_limit
+
+
+def make_request(headers: dict, peer: str = "10.0.0.1") -> Request:
+    """Build a bare request with the given headers and socket peer address."""
+    return Request({
+        "type": "http",
+        "method": "POST",
+        "path": "/api/auth/login",
+        "headers": [(name.lower().encode(), value.encode()) for name, value in headers.items()],
+        "client": (peer, 12345),
+    })
+
+
+class TestGetClientIp:
+    """Tests for get_client_ip."""
+    
+    def test_headers_ignored_without_trusted_proxies(self, monkeypatch):
+        """Test that forwarding headers are ignored when no proxy is trusted."""
+        monkeypatch.setattr(rate_limit, "TRUSTED_PROXY_COUNT", 0)
+        request = make_request({"X-Forwarded-For": "203.0.113.7"})
+        
+        assert rate_limit.get_client_ip(request) == "10.0.0.1"
+    
+    def test_single_proxy_uses_appended_hop(self, monkeypatch):
+        """Test that one trusted proxy yields the address it appended."""
+        monkeypatch.setattr(rate_limit, "TRUSTED_PROXY_COUNT", 1)
+        request = make_request({"X-Forwarded-For": "203.0.113.7"})
+        
+        assert rate_limit.get_client_ip(request) == "203.0.113.7"
+    
+    def test_spoofed_leftmost_hop_ignored(self, monkeypatch):
+        """Test that a client-supplied X-Forwarded-For entry cannot pick the bucket."""
+        monkeypatch.setattr(rate_limit, "TRUSTED_PROXY_COUNT", 1)
+        
+        # The proxy appends the real peer after whatever the client sent
+        first = make_request({"X-Forwarded-For": "1.1.1.1, 203.0.113.7"})
+        second = make_request({"X-Forwarded-For": "2.2.2.2, 203.0.113.7"})
+        
+        assert rate_limit.get_client_ip(first) == "203.0.113.7"
+        assert rate_limit.get_client_ip(second) == "203.0.113.7"
+    
+    def test_two_proxies_use_second_hop_from_right(self, monkeypatch):
+        """Test that the hop is counted from the right for several proxies."""
+        monkeypatch.setattr(rate_limit, "TRUSTED_PROXY_COUNT", 2)
+        request = make_request({"X-Forwarded-For": "9.9.9.9, 203.0.113.7, 10.0.0.2"})
+        
+        assert rate_limit.get_client_ip(request) == "203.0.113.7"
+    
+    def test_too_few_hops_falls_back_to_peer(self, monkeypatch):
+        """Test that a header shorter than the proxy chain is not trusted."""
+        monkeypatch.setattr(rate_limit, "TRUSTED_PROXY_COUNT", 2)
+        request = make_request({"X-Forwarded-For": "203.0.113.7"})
+        
+        assert rate_limit.get_client_ip(request) == "10.0.0.1"
+    
+    @pytest.mark.parametrize("forwarded, expected", [
+        ('for=1.1.1.1, for=203.0.113.7', "203.0.113.7"),
+        ('for=1.1.1.1, for="203.0.113.7:4711";proto=https', "203.0.113.7"),
+        ('for=1.1.1.1, for="[2001:db8::1]:4711"', "2001:db8::1"),
+    ])
+    def test_forwarded_header_uses_trusted_element(self, monkeypatch, forwarded, expected):
+        """Test that the RFC 7239 Forwarded header is read from the trusted element."""
+        monkeypatch.setattr(rate_limit, "TRUSTED_PROXY_COUNT", 1)
+        request = make_request({"Forwarded": forwarded})
+        
+        assert rate_limit.get_client_ip(request) == expected
@@ -3,10 +3,12 @@ Integration tests for rating endpoints.
 Tests rating submission and retrieval.
 """
 import pytest
-from sqlalchemy import create_engine, Column, Integer, String, TIMESTAMP, JSON, ForeignKey, Boolean
+from sqlalchemy import create_engine, Column, Integer, Float, String, TIMESTAMP, JSON, ForeignKey, Boolean
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import sessionmaker, declarative_base, relationship
 from sqlalchemy.sql import func
 from fastapi.testclient import TestClient
+from unittest.mock import patch
 from app.main import app
 from app.database import get_db
 from app.services.auth_service import hash_password, create_access_token
@@ -50,6 +52,9 @@ class Recipe(TestBase):
     image_url = Column(String(500))
     nutritional_info = Column(JSON)
     view_count = Column(Integer, default=0)
+    avg_rating = Column(Float)
+    rating_count = Column(Integer, nullable=False, default=0)
+    rating_sum = Column(Integer, nullable=False, default=0)
     source = Column(String(50), default='groq_ai')
     cache_key = Column(String(255))
     created_at = Column(TIMESTAMP, server_default=func.now())
@@ -123,6 +128,11 @@ def client(db_session):
     app.dependency_overrides.clear()
 
 
+class ForeignKeyViolation(Exception):
+    """Stand-in for the driver error PostgreSQL raises on a foreign key violation."""
+    pgcode = "23503"
+
+
 @pytest.fixture
 def auth_token():
     """Create an authentication token for testing."""
@@ -197,6 +207,37 @@ class TestRatingEndpoints:
         
         assert response.status_code == 404
     
+    def test_submit_rating_deleted_user(self, client, db_session):
+        """Test that a valid token for a deleted user gets a 401, not a 404 or 500."""
+        token = create_access_token({"sub": "999"})
+        
+        with patch(
+            "app.routes.rating_routes.create_or_update_rating",
+            side_effect=IntegrityError("INSERT", {}, ForeignKeyViolation())
+        ):
+            response = client.post(
+                "/api/recipes/1/ratings",
+                json={"rating": 5},
+                cookies={"access_token": token}
+            )
+        
+        assert response.status_code == 401
+        assert response.json()["error_code"] == "USER_NOT_FOUND"
+    
+    def test_submit_rating_foreign_key_violation_existing_user(self, client, db_session, auth_token):
+        """Test that a foreign key violation for an existing user means the recipe is gone."""
+        with patch(
+            "app.routes.rating_routes.create_or_update_rating",
+            side_effect=IntegrityError("INSERT", {}, ForeignKeyViolation())
+        ):
+            response = client.post(
+                "/api/recipes/1/ratings",
+                json={"rating": 5},
+                cookies={"access_token": auth_token}
+            )
+        
+        assert response.status_code == 404
+    
     def test_get_ratings_no_ratings(self, client, db_session):
         """Test getting ratings for recipe with no ratings."""
         response = client.get("/api/recipes/1/ratings")
@@ -3,7 +3,7 @@ Unit tests for rating service.
 Tests rating creation, update, average calculation, and validation.
 """
 import pytest
-from sqlalchemy import create_engine, Column, Integer, String, TIMESTAMP, ForeignKey, JSON, Boolean, CheckConstraint
+from sqlalchemy import create_engine, Column, Integer, Float, String, TIMESTAMP, ForeignKey, JSON, Boolean, CheckConstraint
 from sqlalchemy.orm import sessionmaker, declarative_base, relationship
 from sqlalchemy.sql import func
 
@@ -52,6 +52,9 @@ class Recipe(TestBase):
     image_url = Column(String(500))
     nutritional_info = Column(JSON)
     view_count = Column(Integer, default=0)
+    avg_rating = Column(Float)
+    rating_count = Column(Integer, nullable=False, default=0)
+    rating_sum = Column(Integer, nullable=False, default=0)
     source = Column(String(50), default='groq_ai')
     cache_key = Column(String(255))
     created_at = Column(TIMESTAMP, server_default=func.now())
@@ -215,6 +218,19 @@ class TestCreateOrUpdateRating:
             RecipeRating.recipe_id == 1
         ).count()
         assert ratings_count == 2
+    
+    def test_rating_stats_track_integer_sum(self, db_session):
+        """Test that the denormalized stats keep an exact sum alongside the count."""
+        create_or_update_rating(db=db_session, user_id=1, recipe_id=1, rating_value=5)
+        create_or_update_rating(db=db_session, user_id=2, recipe_id=1, rating_value=4)
+        create_or_update_rating(db=db_session, user_id=3, recipe_id=1, rating_value=4)
+        create_or_update_rating(db=db_session, user_id=1, recipe_id=1, rating_value=2)
+        
+        recipe = db_session.query(Recipe).filter(Recipe.id == 1).one()
+        db_session.refresh(recipe)
+        assert recipe.rating_sum == 10
+        assert recipe.rating_count == 3
+        assert recipe.avg_rating == pytest.approx(10 / 3)
 
 
 class TestGetRecipeRatings:
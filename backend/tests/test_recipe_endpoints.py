@@ -3,13 +3,17 @@ Integration tests for recipe endpoints.
 Tests recipe search, detail retrieval, and popular recipes.
 """
 import pytest
-from sqlalchemy import create_engine, Column, Integer, String, TIMESTAMP, JSON, ForeignKey, Boolean
+from base64 import urlsafe_b64encode
+from sqlalchemy import create_engine, Column, Integer, Float, String, TIMESTAMP, JSON, ForeignKey, Boolean
 from sqlalchemy.orm import sessionmaker, declarative_base, relationship
 from sqlalchemy.sql import func
 from fastapi.testclient import TestClient
 from unittest.mock import patch, MagicMock
 from app.main import app
 from app.database import get_db
+from app.services.ingredient_service import normalize_ingredient_name
+from app.services.auth_service import create_access_token
+from app.services.popular_recipes_cache import clear_popular_cache, get_cached_popular
 
 # Use in-memory SQLite database for testing
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test_recipes.db"
@@ -31,6 +35,12 @@ class Ingredient(TestBase):
     name = Column(String(100), unique=True, nullable=False, index=True)
     category = Column(String(50), nullable=False)
     synonyms = Column(String(500))
+    # Populated like the app's flush listener, which only targets the real model
+    normalized_name = Column(
+        String(100),
+        index=True,
+        default=lambda ctx: normalize_ingredient_name(ctx.get_current_parameters()["name"])
+    )
     created_at = Column(TIMESTAMP, server_default=func.now())
     
     recipe_ingredients = relationship("RecipeIngredient", back_populates="ingredient")
@@ -50,6 +60,9 @@ class Recipe(TestBase):
     image_url = Column(String(500))
     nutritional_info = Column(JSON)
     view_count = Column(Integer, default=0)
+    avg_rating = Column(Float)
+    rating_count = Column(Integer, nullable=False, default=0)
+    rating_sum = Column(Integer, nullable=False, default=0)
     source = Column(String(50), default='groq_ai')
     cache_key = Column(String(255), index=True)
     created_at = Column(TIMESTAMP, server_default=func.now())
@@ -179,6 +192,11 @@ def db_session():
     rating2 = RecipeRating(user_id=2, recipe_id=1, rating=4)
     
     db.add_all([rating1, rating2])
+    
+    # Denormalized stats as the recipe_ratings_stats trigger leaves them
+    recipe1.avg_rating = 4.5
+    recipe1.rating_count = 2
+    recipe1.rating_sum = 9
     db.commit()
     
     try:
@@ -198,6 +216,7 @@ def client(db_session):
             pass
     
     app.dependency_overrides[get_db] = override_get_db
+    clear_popular_cache()
     with TestClient(app) as test_client:
         yield test_client
     app.dependency_overrides.clear()
@@ -266,6 +285,98 @@ class TestRecipeSearch:
         assert data["total_pages"] >= 1
 
 
+@pytest.fixture
+def ranked_recipes(db_session):
+    """Serve every seeded recipe, plus three with no ingredients, as the search candidates."""
+    db_session.add_all([
+        Recipe(
+            id=recipe_id,
+            name=f"Pantry Dish {recipe_id}",
+            instructions=["Cook"],
+            cooking_time_minutes=10,
+            difficulty="easy",
+            serving_size=1,
+            cache_key=f"test_cache_key_{recipe_id}"
+        )
+        for recipe_id in (3, 4, 5)
+    ])
+    db_session.commit()
+    
+    with patch('app.routes.recipe_routes.get_cached_recipes') as mock_cached:
+        mock_cached.return_value = db_session.query(Recipe).all()
+        yield
+
+
+class TestRecipeSearchCursor:
+    """Test cursor pagination of recipe search."""
+    
+    @staticmethod
+    def search(client, **params):
+        """Search for chicken and rice with the given pagination parameters."""
+        return client.post(
+            "/api/recipes/search",
+            json={"ingredients": ["chicken", "rice"], "filters": {}, **params}
+        )
+    
+    def test_first_page_emits_next_cursor(self, client, ranked_recipes):
+        """Test that a page with more results after it carries a cursor."""
+        response = self.search(client, page_size=2)
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert [recipe["id"] for recipe in data["recipes"]] == [1, 2]
+        assert data["total"] == 5
+        assert data["next_cursor"]
+    
+    def test_cursor_resumes_without_duplicates_or_gaps(self, client, ranked_recipes):
+        """Test that following cursors visits the full ranking exactly once."""
+        ranked_ids = [recipe["id"] for recipe in self.search(client, page_size=100).json()["recipes"]]
+        # Full match, half match, then the zero-match ties ordered by id descending
+        assert ranked_ids == [1, 2, 5, 4, 3]
+        
+        seen_ids = []
+        pages = []
+        cursor = None
+        while True:
+            params = {"page_size": 2, "cursor": cursor} if cursor else {"page_size": 2}
+            data = self.search(client, **params).json()
+            seen_ids.extend(recipe["id"] for recipe in data["recipes"])
+            pages.append(data["page"])
+            cursor = data["next_cursor"]
+            if cursor is None:
+                break
+        
+        assert seen_ids == ranked_ids
+        assert pages == [1, 2, 3]
+    
+    def test_last_page_has_no_cursor(self, client, ranked_recipes):
+        """Test that the page holding the final result does not emit a cursor."""
+        first = self.search(client, page_size=3).json()
+        last = self.search(client, page_size=3, cursor=first["next_cursor"]).json()
+        
+        assert [recipe["id"] for recipe in last["recipes"]] == [4, 3]
+        assert last["next_cursor"] is None
+        
+        # An exactly full final page also ends the traversal
+        assert self.search(client, page_size=5).json()["next_cursor"] is None
+    
+    @pytest.mark.parametrize("cursor", [
+        "not a cursor",
+        "%%%",
+        urlsafe_b64encode(b"not json").decode(),
+        urlsafe_b64encode(b'["high", 1]').decode(),
+        urlsafe_b64encode(b'[50.0]').decode(),
+        urlsafe_b64encode(b'{"match": 50.0, "id": 1}').decode(),
+        urlsafe_b64encode(b'[null, 1]').decode(),
+    ])
+    def test_invalid_cursor_rejected(self, client, ranked_recipes, cursor):
+        """Test that a malformed or tampered cursor is a client error."""
+        response = self.search(client, page_size=2, cursor=cursor)
+        
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Invalid pagination cursor"
+
+
 class TestRecipeDetail:
     """Test recipe detail endpoint."""
     
@@ -282,6 +393,17 @@ class TestRecipeDetail:
         assert "average_rating" in data
         assert "total_ratings" in data
     
+    def test_recipe_rating_stats_match_across_endpoints(self, client, db_session):
+        """Test that detail and popular both report the denormalized rating stats."""
+        detail = client.get("/api/recipes/1").json()
+        popular = client.get("/api/recipes/popular?limit=10").json()
+        popular_recipe = next(r for r in popular["recipes"] if r["id"] == 1)
+        
+        assert detail["average_rating"] == 4.5
+        assert detail["total_ratings"] == 2
+        assert popular_recipe["average_rating"] == detail["average_rating"]
+        assert popular_recipe["total_ratings"] == detail["total_ratings"]
+    
     def test_get_recipe_detail_increments_view_count(self, client, db_session):
         """Test that viewing recipe increments view count."""
         # Get initial view count
@@ -335,3 +457,43 @@ class TestPopularRecipes:
         assert response.status_code == 200
         data = response.json()
         assert len(data["recipes"]) <= 1
+    
+    def test_popular_recipes_overlay_caller_rating(self, client, db_session):
+        """Test that the cached list is shared while each caller sees their own rating."""
+        def user_rating(cookies=None):
+            response = client.get("/api/recipes/popular?limit=10", cookies=cookies)
+            assert response.status_code == 200
+            return next(r for r in response.json()["recipes"] if r["id"] == 1)["user_rating"]
+        
+        assert user_rating() is None
+        assert user_rating({"access_token": create_access_token({"sub": "1"})}) == 5
+        assert user_rating({"access_token": create_access_token({"sub": "2"})}) == 4
+        assert user_rating() is None
+        
+        # One user-independent entry serves every caller
+        cached = get_cached_popular(10)
+        assert cached is not None
+        assert all(recipe.user_rating is None for recipe in cached.recipes)
+    
+    def test_submit_rating_invalidates_popular_cache(self, client, db_session):
+        """Test that a new rating is reflected in the popular list immediately."""
+        popular = client.get("/api/recipes/popular?limit=10").json()
+        assert next(r for r in popular["recipes"] if r["id"] == 1)["average_rating"] == 4.5
+        
+        token = create_access_token({"sub": "3"})
+        response = client.post(
+            "/api/recipes/1/ratings",
+            json={"rating": 3},
+            cookies={"access_token": token}
+        )
+        assert response.status_code == 200
+        assert get_cached_popular(10) is None
+        
+        response = client.get(
+            "/api/recipes/popular?limit=10",
+            cookies={"access_token": token}
+        )
+        recipe = next(r for r in response.json()["recipes"] if r["id"] == 1)
+        assert recipe["average_rating"] == 4.0
+        assert recipe["total_ratings"] == 3
+        assert recipe["user_rating"] == 3
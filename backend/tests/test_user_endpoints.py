@@ -3,12 +3,13 @@ Integration tests for user favorites and shopping list endpoints.
 """
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine, Column, Integer, String, Text, Boolean, TIMESTAMP, ForeignKey, JSON, ARRAY
+from sqlalchemy import create_engine, Column, Integer, Float, String, Text, Boolean, TIMESTAMP, ForeignKey, JSON, ARRAY
 from sqlalchemy.orm import sessionmaker, declarative_base, relationship
 from sqlalchemy.sql import func
 from app.database import get_db
 from app.main import app
 from app.services import auth_service
+from app.services.ingredient_service import normalize_ingredient_name
 
 # Use in-memory SQLite database for testing
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test_user.db"
@@ -42,6 +43,12 @@ class Ingredient(TestBase):
     name = Column(String(100), unique=True, nullable=False, index=True)
     category = Column(String(50), nullable=False)
     synonyms = Column(Text, default="")
+    # Populated like the app's flush listener, which only targets the real model
+    normalized_name = Column(
+        String(100),
+        index=True,
+        default=lambda ctx: normalize_ingredient_name(ctx.get_current_parameters()["name"])
+    )
     created_at = Column(TIMESTAMP, server_default=func.now())
     
     shopping_list_items = relationship("ShoppingListItem", back_populates="ingredient")
@@ -60,6 +67,9 @@ class Recipe(TestBase):
     image_url = Column(String(500))
     nutritional_info = Column(JSON)
     view_count = Column(Integer, default=0)
+    avg_rating = Column(Float)
+    rating_count = Column(Integer, nullable=False, default=0)
+    rating_sum = Column(Integer, nullable=False, default=0)
     source = Column(String(50), default='groq_ai')
     cache_key = Column(String(255))
     created_at = Column(TIMESTAMP, server_default=func.now())
@@ -243,6 +253,8 @@ class TestFavoritesEndpoints:
         # Add favorite
         favorite = UserFavorite(user_id=test_user.id, recipe_id=test_recipe.id)
         db_session.add(favorite)
+        test_recipe.avg_rating = 4.5
+        test_recipe.rating_count = 2
         db_session.commit()
         
         response = client.get(
@@ -257,6 +269,8 @@ class TestFavoritesEndpoints:
         assert data["recipes"][0]["id"] == test_recipe.id
         assert data["recipes"][0]["name"] == test_recipe.name
         assert "favorited_at" in data["recipes"][0]
+        assert data["recipes"][0]["average_rating"] == 4.5
+        assert data["recipes"][0]["total_ratings"] == 2
     
     def test_get_favorites_unauthenticated(self, client):
         """Test getting favorites without authentication."""
@@ -276,10 +290,8 @@ class TestFavoritesEndpoints:
             cookies={"access_token": auth_token}
         )
         
-        assert response.status_code == 200
-        data = response.json()
-        assert data["success"] is True
-        assert "removed" in data["message"].lower()
+        assert response.status_code == 204
+        assert response.content == b""
     
     def test_remove_favorite_not_found(self, client, test_user, test_recipe, auth_token):
         """Test removing recipe that is not in favorites."""
@@ -431,10 +443,8 @@ class TestShoppingListEndpoints:
             cookies={"access_token": auth_token}
         )
         
-        assert response.status_code == 200
-        data = response.json()
-        assert data["success"] is True
-        assert "removed" in data["message"].lower()
+        assert response.status_code == 204
+        assert response.content == b""
     
     def test_remove_from_shopping_list_not_found(self, client, test_user, auth_token):
         """Test removing non-existent item from shopping list."""
@@ -169,7 +169,7 @@ describe('UserProfile Component', () => {
 
     mockedUserService.getFavorites.mockResolvedValue({ recipes: [] });
     mockedUserService.getShoppingList.mockResolvedValue(mockItems);
-    mockedUserService.removeFromShoppingList.mockResolvedValue({ success: true });
+    mockedUserService.removeFromShoppingList.mockResolvedValue(undefined);
 
     renderUserProfile();
 
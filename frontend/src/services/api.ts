@@ -194,9 +194,9 @@ export const apiClient = {
   /**
    * Remove a recipe from favorites
    */
-  removeFavorite: async (recipeId: number): Promise<{ success: boolean }> => {
-    const response = await axiosInstance.delete<{ success: boolean }>(`/api/users/favorites/${recipeId}`);
-    return response.data;
+  removeFavorite: async (recipeId: number): Promise<void> => {
+    // Responds 204 No Content
+    await axiosInstance.delete(`/api/users/favorites/${recipeId}`);
   },
 
   // ==================== Shopping List Endpoints ====================
@@ -220,9 +220,9 @@ export const apiClient = {
   /**
    * Remove an item from shopping list
    */
-  removeFromShoppingList: async (itemId: number): Promise<{ success: boolean }> => {
-    const response = await axiosInstance.delete<{ success: boolean }>(`/api/users/shopping-list/${itemId}`);
-    return response.data;
+  removeFromShoppingList: async (itemId: number): Promise<void> => {
+    // Responds 204 No Content
+    await axiosInstance.delete(`/api/users/shopping-list/${itemId}`);
   },
 };
 
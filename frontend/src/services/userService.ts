@@ -26,9 +26,9 @@ export const userService = {
     }
   },
 
-  removeFavorite: async (recipeId: number): Promise<{ success: boolean }> => {
+  removeFavorite: async (recipeId: number): Promise<void> => {
     try {
-      return await apiClient.removeFavorite(recipeId);
+      await apiClient.removeFavorite(recipeId);
     } catch (error) {
       if (error instanceof ApiError) {
         throw error;
@@ -60,9 +60,9 @@ export const userService = {
     }
   },
 
-  removeFromShoppingList: async (itemId: number): Promise<{ success: boolean }> => {
+  removeFromShoppingList: async (itemId: number): Promise<void> => {
     try {
-      return await apiClient.removeFromShoppingList(itemId);
+      await apiClient.removeFromShoppingList(itemId);
     } catch (error) {
       if (error instanceof ApiError) {
         throw error;